@@ -12,12 +12,13 @@ Commands:
 from __future__ import annotations
 
 import asyncio
-import json
+import functools
 import sys
 import time
 from pathlib import Path
 from typing import Optional
 
+import orjson
 import typer
 from rich.console import Console
 from rich.live import Live
@@ -28,8 +29,10 @@ from rich.text import Text
 from . import __version__
 from .core.cline import ClineWrapper
 from .core.config import load_config
+from .core.github_ops import close_github_http
 from .core.propagator import CascadeResult, Propagator, Status
 from .core.reporter import generate_summary
+from .core.state import STATE_DB, StateStore
 
 app = typer.Typer(
     name="cascade",
@@ -47,7 +50,19 @@ BANNER = r"""
   Multi-Repo Change Propagator · Cline CLI as Infrastructure
 """
 
-STATE_FILE = Path.home() / ".cascade" / "last_run.json"
+
+STATUS_STYLES = {
+    Status.WAITING: "[dim]waiting[/dim]",
+    Status.BRANCHING: "[yellow]branching[/yellow]",
+    Status.ADAPTING: "[blue bold]adapting...[/blue bold]",
+    Status.TESTING: "[yellow]testing[/yellow]",
+    Status.FIXING: "[magenta]fixing...[/magenta]",
+    Status.REVIEWING: "[cyan]reviewing[/cyan]",
+    Status.COMMITTING: "[yellow]committing[/yellow]",
+    Status.DONE: "[green bold]done[/green bold]",
+    Status.FAILED: "[red bold]FAILED[/red bold]",
+    Status.SKIPPED: "[dim]skipped[/dim]",
+}
 
 
 def _find_config(config_path: Optional[str]) -> Path:
@@ -65,9 +80,14 @@ def _find_config(config_path: Optional[str]) -> Path:
     raise typer.Exit(1)
 
 
-def _save_result(result: CascadeResult):
-    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
-    STATE_FILE.write_text(json.dumps(result.to_dict(), indent=2, default=str))
+def _install_uvloop() -> bool:
+    """Use uvloop's event loop when it is installed; report whether it is."""
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
 
 
 def _build_live_table(result: CascadeResult) -> Table:
@@ -80,21 +100,8 @@ def _build_live_table(result: CascadeResult) -> Table:
     table.add_column("Files", justify="right")
     table.add_column("Time", justify="right")
 
-    status_styles = {
-        Status.WAITING: "[dim]waiting[/dim]",
-        Status.BRANCHING: "[yellow]branching[/yellow]",
-        Status.ADAPTING: "[blue bold]adapting...[/blue bold]",
-        Status.TESTING: "[yellow]testing[/yellow]",
-        Status.FIXING: "[magenta]fixing...[/magenta]",
-        Status.REVIEWING: "[cyan]reviewing[/cyan]",
-        Status.COMMITTING: "[yellow]committing[/yellow]",
-        Status.DONE: "[green bold]done[/green bold]",
-        Status.FAILED: "[red bold]FAILED[/red bold]",
-        Status.SKIPPED: "[dim]skipped[/dim]",
-    }
-
     for repo in result.repo_results:
-        status_text = status_styles.get(repo.status, repo.status)
+        status_text = STATUS_STYLES.get(repo.status, repo.status)
         test_text = "[green]pass[/green]" if repo.test_passed else "[dim]-[/dim]"
         if repo.status == Status.FAILED and repo.test_output:
             test_text = "[red]fail[/red]"
@@ -114,6 +121,31 @@ def _build_live_table(result: CascadeResult) -> Table:
     return table
 
 
+class _LiveTable:
+    """
+    Renderable for the propagation table.
+
+    The table is only rebuilt when a propagator event has arrived since the
+    last frame (see touch), or once a second so the Time column keeps ticking.
+    """
+
+    def __init__(self, result: CascadeResult):
+        self.result = result
+        self.version = 0
+        self._built_for: Optional[tuple[int, int]] = None
+        self._table: Optional[Table] = None
+
+    def touch(self, *_event):
+        self.version += 1
+
+    def __rich__(self) -> Table:
+        key = (self.version, int(time.monotonic()))
+        if self._table is None or key != self._built_for:
+            self._table = _build_live_table(self.result)
+            self._built_for = key
+        return self._table
+
+
 @app.command()
 def run(
     change: str = typer.Argument(..., help="Description of the API/schema change to propagate"),
@@ -122,6 +154,7 @@ def run(
     model: Optional[str] = typer.Option(None, "--model", "-m", help="Override Cline model"),
 ):
     """Propagate a change across all configured repositories."""
+    _install_uvloop()
     console.print(BANNER, style="bold cyan")
     console.print(f"[bold]Change:[/bold] {change}\n")
 
@@ -145,57 +178,73 @@ def run(
     )
 
     cascade_result = CascadeResult(change_description=change, started_at=time.time())
+    live_table = _LiveTable(cascade_result)
+    store = StateStore()
+    run_id = store.start_run(change)
+
+    def _on_event(event_type: str, data: dict):
+        live_table.touch()
+        # Checkpoint each repo as it changes state so `cascade status`
+        # works mid-run and a crash does not lose finished repos.
+        if event_type.startswith("repo.") and "repo_name" in data:
+            store.save_repo(run_id, data)
+
+    propagator = Propagator(
+        config=cfg,
+        cline=cline,
+        adapt_prompt_template=adapt_tpl,
+        verify_prompt_template=verify_tpl,
+        fix_prompt_template=fix_tpl,
+        on_event=_on_event,
+    )
 
-    async def _run():
-        propagator = Propagator(
-            config=cfg,
-            cline=cline,
-            adapt_prompt_template=adapt_tpl,
-            verify_prompt_template=verify_tpl,
-            fix_prompt_template=fix_tpl,
-        )
-        return await propagator.run(change, dry_run=dry_run)
-
-    with Live(_build_live_table(cascade_result), console=console, refresh_per_second=2) as live:
-        async def _run_with_live():
-            propagator = Propagator(
-                config=cfg,
-                cline=cline,
-                adapt_prompt_template=adapt_tpl,
-                verify_prompt_template=verify_tpl,
-                fix_prompt_template=fix_tpl,
-                on_event=lambda t, d: _update_live(live, cascade_result),
-            )
-            nonlocal cascade_result
-            cascade_result = await propagator.run(change, dry_run=dry_run)
-            live.update(_build_live_table(cascade_result))
-
-        asyncio.run(_run_with_live())
+    async def _propagate():
+        try:
+            await propagator.run(change, dry_run=dry_run, result=cascade_result)
+        finally:
+            await close_github_http()
+
+    # Closed out even when propagation raises or is interrupted (Ctrl-C),
+    # so `cascade status` never shows a dead run as still in progress.
+    run_status = "aborted"
+    try:
+        # Live re-renders _LiveTable on its own refresh tick; propagator
+        # events only mark it stale and never trigger redraws directly.
+        with Live(live_table, console=console, refresh_per_second=2):
+            asyncio.run(_propagate())
+        run_status = "finished"
+    finally:
+        store.finish_run(run_id, status=run_status)
+        store.close()
 
     console.print()
     console.print(generate_summary(cascade_result))
 
-    _save_result(cascade_result)
-
     if cascade_result.fail_count > 0:
         raise typer.Exit(1)
 
 
-def _update_live(live: Live, result: CascadeResult):
-    live.update(_build_live_table(result))
-
-
 @app.command()
 def status():
     """Show the last run results."""
-    if not STATE_FILE.exists():
+    if not STATE_DB.exists():
+        console.print("[dim]No previous run found.[/dim]")
+        raise typer.Exit(0)
+
+    store = StateStore()
+    data = store.latest_run()
+    store.close()
+    if data is None:
         console.print("[dim]No previous run found.[/dim]")
         raise typer.Exit(0)
 
-    data = json.loads(STATE_FILE.read_text())
     console.print(Panel(
-        json.dumps(data, indent=2),
-        title="Last Cascade Run",
+        orjson.dumps(data, option=orjson.OPT_INDENT_2).decode(),
+        title=(
+            "Cascade Run (in progress)" if data["in_progress"]
+            else "Last Cascade Run (aborted)" if data["status"] == "aborted"
+            else "Last Cascade Run"
+        ),
         border_style="cyan",
     ))
 
@@ -207,6 +256,7 @@ def dashboard(
     config: Optional[str] = typer.Option(None, "--config", "-f", help="Path to cascade.yaml"),
 ):
     """Launch the live monitoring dashboard."""
+    have_uvloop = _install_uvloop()
     console.print(BANNER, style="bold cyan")
     console.print(f"Starting dashboard at http://{host}:{port}\n")
 
@@ -215,7 +265,13 @@ def dashboard(
 
     config_path = str(_find_config(config)) if config else None
     dash_app = create_app(config_path=config_path)
-    uvicorn.run(dash_app, host=host, port=port, log_level="info")
+    # uvicorn installs its own loop policy; keep it on the same loop.
+    uvicorn.run(
+        dash_app, host=host, port=port, log_level="info",
+        loop="uvloop" if have_uvloop else "asyncio",
+        # Native WebSocket ping/pong keeps dashboard connections alive.
+        ws_ping_interval=20.0, ws_ping_timeout=20.0,
+    )
 
 
 @app.command()
@@ -246,6 +302,7 @@ repos:
 
 settings:
   max_parallel: 4
+  max_parallel_tests: 4
   timeout_per_repo: 600
   auto_branch: true
   branch_prefix: "cascade/"
@@ -270,6 +327,13 @@ def version():
 
 
 def _load_template(path: Path) -> Optional[str]:
-    if path.exists():
-        return path.read_text()
-    return None
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _read_template(str(path), mtime_ns)
+
+
+@functools.lru_cache(maxsize=16)
+def _read_template(path: str, mtime_ns: int) -> str:
+    return Path(path).read_text()
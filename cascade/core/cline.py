@@ -13,15 +13,23 @@ from __future__ import annotations
 
 import asyncio
 import json
+import re
 import shutil
 import time
 import uuid
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 
+import orjson
 
-@dataclass
+READ_CHUNK_SIZE = 65536
+
+# Provider throttling errors that make a failed invocation worth retrying.
+RETRIABLE_RE = re.compile(r"rate.?limit|quota|\b429\b", re.IGNORECASE)
+
+
+@dataclass(slots=True)
 class ClineResult:
     """Outcome of a single Cline CLI invocation."""
 
@@ -33,6 +41,7 @@ class ClineResult:
     duration_seconds: float = 0.0
     error: str = ""
     json_messages: list[dict] = field(default_factory=list)
+    attempts: int = 1
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -43,6 +52,7 @@ class ClineResult:
             "error": self.error,
             "stdout_len": len(self.stdout),
             "json_message_count": len(self.json_messages),
+            "attempts": self.attempts,
         }
 
     @property
@@ -76,11 +86,20 @@ class ClineWrapper:
         binary: Optional[str] = None,
         max_concurrent: int = 4,
         default_timeout: int = 600,
+        rate_per_sec: float = 2.0,
+        max_attempts: int = 3,
+        backoff_base: float = 2.0,
+        max_backoff: float = 30.0,
     ):
         self.binary = binary or self._locate_binary()
         self.max_concurrent = max_concurrent
         self.default_timeout = default_timeout
+        self.min_interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
         self._sem = asyncio.Semaphore(max_concurrent)
+        self._last_dispatch = 0.0
         self._active: dict[str, asyncio.subprocess.Process] = {}
 
     @staticmethod
@@ -90,33 +109,82 @@ class ClineWrapper:
             return found
         return "cline"
 
-    def _build_cmd(
+    def _cmd_parts(
         self,
-        prompt: str,
-        cwd: Optional[str] = None,
         yolo: bool = False,
         json_output: bool = False,
         plan_mode: bool = False,
         model: Optional[str] = None,
         timeout: Optional[int] = None,
-    ) -> list[str]:
-        cmd = [self.binary]
-
+    ) -> tuple[tuple[str, ...], tuple[str, ...]]:
+        """Split the argv into the flags before ``-c <cwd>`` and those after."""
+        head = [self.binary]
         if yolo:
-            cmd.append("-y")
+            head.append("-y")
         if json_output:
-            cmd.append("--json")
+            head.append("--json")
         if plan_mode:
-            cmd.append("-p")
-        if cwd:
-            cmd.extend(["-c", str(cwd)])
+            head.append("-p")
+
+        tail: list[str] = []
         if model:
-            cmd.extend(["-m", model])
+            tail.extend(["-m", model])
         if timeout:
-            cmd.extend(["--timeout", str(timeout)])
+            tail.extend(["--timeout", str(timeout)])
+        return tuple(head), tuple(tail)
+
+    @staticmethod
+    def _assemble(
+        head: tuple[str, ...], tail: tuple[str, ...], prompt: str, cwd: Optional[str],
+    ) -> list[str]:
+        if cwd:
+            return [*head, "-c", str(cwd), *tail, prompt]
+        return [*head, *tail, prompt]
+
+    def _build_cmd(
+        self,
+        prompt: str,
+        cwd: Optional[str] = None,
+        yolo: bool = False,
+        json_output: bool = False,
+        plan_mode: bool = False,
+        model: Optional[str] = None,
+        timeout: Optional[int] = None,
+    ) -> list[str]:
+        head, tail = self._cmd_parts(yolo, json_output, plan_mode, model, timeout)
+        return self._assemble(head, tail, prompt, cwd)
+
+    def session(
+        self,
+        yolo: bool = False,
+        json_output: bool = False,
+        plan_mode: bool = False,
+        model: Optional[str] = None,
+        timeout: Optional[int] = None,
+    ) -> Callable[..., Awaitable[ClineResult]]:
+        """
+        Fix the invocation flags once and return an ``invoke(prompt, cwd=None,
+        ...)`` coroutine function that only fills in the per-call parts.
 
-        cmd.append(prompt)
-        return cmd
+        For batches where every repo gets the same flags, the argv is
+        prebuilt here instead of on every call.
+        """
+        head, tail = self._cmd_parts(yolo, json_output, plan_mode, model, timeout)
+
+        async def invoke(
+            prompt: str,
+            cwd: Optional[str] = None,
+            stdin_data: Optional[str] = None,
+            env: Optional[dict[str, str]] = None,
+            on_output: Optional[Callable[[str], Any]] = None,
+            keep_raw: bool = False,
+        ) -> ClineResult:
+            return await self._dispatch(
+                self._assemble(head, tail, prompt, cwd), json_output, timeout,
+                stdin_data, env, on_output, keep_raw,
+            )
+
+        return invoke
 
     async def invoke(
         self,
@@ -130,6 +198,7 @@ class ClineWrapper:
         stdin_data: Optional[str] = None,
         env: Optional[dict[str, str]] = None,
         on_output: Optional[Callable[[str], Any]] = None,
+        keep_raw: bool = False,
     ) -> ClineResult:
         """
         Run a single Cline CLI invocation.
@@ -145,31 +214,71 @@ class ClineWrapper:
             stdin_data:  Data to pipe to stdin.
             env:         Extra environment variables (e.g. CLINE_COMMAND_PERMISSIONS).
             on_output:   Callback for streaming output lines.
+            keep_raw:    In JSON mode, also keep parsed lines in stdout.
+
+        Dispatches are spaced at least ``min_interval`` apart, and runs that
+        fail with a provider rate-limit error are retried with exponential
+        backoff (the concurrency slot is released while backing off).
         """
-        async with self._sem:
-            return await self._run(
-                prompt, cwd, yolo, json_output, plan_mode,
-                model, timeout, stdin_data, env, on_output,
-            )
+        cmd = self._build_cmd(prompt, cwd, yolo, json_output, plan_mode, model, timeout)
+        return await self._dispatch(
+            cmd, json_output, timeout, stdin_data, env, on_output, keep_raw,
+        )
+
+    async def _dispatch(
+        self,
+        cmd: list[str],
+        json_output: bool,
+        timeout: Optional[int],
+        stdin_data: Optional[str],
+        env: Optional[dict[str, str]],
+        on_output: Optional[Callable],
+        keep_raw: bool,
+    ) -> ClineResult:
+        for attempt in range(self.max_attempts):
+            async with self._sem:
+                await self._throttle()
+                result = await self._run(
+                    cmd, json_output, timeout, stdin_data, env, on_output, keep_raw,
+                )
+            result.attempts = attempt + 1
+            if result.success or not self._is_retriable(result):
+                break
+            if attempt + 1 < self.max_attempts:
+                await asyncio.sleep(min(self.max_backoff, self.backoff_base * 2 ** attempt))
+        return result
+
+    async def _throttle(self):
+        """Reserve the next dispatch slot and wait for it."""
+        if not self.min_interval:
+            return
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._last_dispatch + self.min_interval)
+        self._last_dispatch = slot
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    @staticmethod
+    def _is_retriable(result: ClineResult) -> bool:
+        """Only transient provider throttling is worth retrying."""
+        if result.exit_code in (0, 127) or result.error.startswith("Timed out"):
+            return False
+        return bool(RETRIABLE_RE.search(result.stderr) or RETRIABLE_RE.search(result.stdout))
 
     async def _run(
         self,
-        prompt: str,
-        cwd: Optional[str],
-        yolo: bool,
+        cmd: list[str],
         json_output: bool,
-        plan_mode: bool,
-        model: Optional[str],
         timeout: Optional[int],
         stdin_data: Optional[str],
         env: Optional[dict[str, str]],
         on_output: Optional[Callable],
+        keep_raw: bool,
     ) -> ClineResult:
         import os
 
         inv_id = uuid.uuid4().hex[:10]
         effective_timeout = timeout or self.default_timeout
-        cmd = self._build_cmd(prompt, cwd, yolo, json_output, plan_mode, model, timeout)
         result = ClineResult(invocation_id=inv_id)
         start = time.monotonic()
 
@@ -190,17 +299,56 @@ class ClineWrapper:
             out_chunks: list[str] = []
             err_chunks: list[str] = []
 
-            async def read_stream(stream, chunks, callback=None):
-                while True:
-                    line = await stream.readline()
-                    if not line:
-                        break
-                    text = line.decode("utf-8", errors="replace")
+            async def notify(callback, line: str):
+                cb_result = callback(line)
+                if asyncio.iscoroutine(cb_result):
+                    await cb_result
+
+            async def emit_lines(data: bytes, chunks, callback, messages):
+                if messages is None:
+                    text = data.decode("utf-8", errors="replace")
                     chunks.append(text)
                     if callback:
-                        cb_result = callback(text)
-                        if asyncio.iscoroutine(cb_result):
-                            await cb_result
+                        start = 0
+                        while start < len(text):
+                            end = text.find("\n", start) + 1 or len(text)
+                            await notify(callback, text[start:end])
+                            start = end
+                    return
+                # --json mode: parse each line straight from the byte slice,
+                # keep parsed messages, and decode to text only the lines that
+                # are not JSON (or all of them when asked to / for callbacks).
+                view = memoryview(data)
+                start = 0
+                while start < len(data):
+                    end = data.find(b"\n", start) + 1 or len(data)
+                    raw = view[start:end]
+                    start = end
+                    msg = self._parse_json_line(raw)
+                    if msg is not None:
+                        messages.append(msg)
+                    keep = msg is None or keep_raw
+                    if keep or callback:
+                        line = str(raw, "utf-8", "replace")
+                        if keep:
+                            chunks.append(line)
+                        if callback:
+                            await notify(callback, line)
+
+            async def read_stream(stream, chunks, callback=None, messages=None):
+                # Read in large chunks and decode whole lines at once rather
+                # than waking up once per line.
+                buf = bytearray()
+                while chunk := await stream.read(READ_CHUNK_SIZE):
+                    buf += chunk
+                    nl = buf.rfind(b"\n")
+                    if nl == -1:
+                        continue
+                    data = bytes(buf[:nl + 1])
+                    del buf[:nl + 1]
+                    await emit_lines(data, chunks, callback, messages)
+                if buf:
+                    await emit_lines(bytes(buf), chunks, callback, messages)
 
             try:
                 if stdin_data:
@@ -210,7 +358,10 @@ class ClineWrapper:
 
                 await asyncio.wait_for(
                     asyncio.gather(
-                        read_stream(proc.stdout, out_chunks, on_output),
+                        read_stream(
+                            proc.stdout, out_chunks, on_output,
+                            result.json_messages if json_output else None,
+                        ),
                         read_stream(proc.stderr, err_chunks),
                     ),
                     timeout=effective_timeout,
@@ -226,9 +377,6 @@ class ClineWrapper:
             result.exit_code = proc.returncode or 0
             result.success = result.exit_code == 0 and not result.error
 
-            if json_output and result.stdout:
-                result.json_messages = self._parse_json_lines(result.stdout)
-
         except FileNotFoundError:
             result.success = False
             result.exit_code = 127
@@ -260,18 +408,14 @@ class ClineWrapper:
             await self.cancel(inv_id)
 
     @staticmethod
-    def _parse_json_lines(output: str) -> list[dict]:
-        """Parse --json output: one JSON object per line."""
-        messages = []
-        for line in output.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                messages.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
-        return messages
+    def _parse_json_line(line: bytes | memoryview | str) -> Optional[dict]:
+        """Parse a single --json output line, or None if it is not JSON."""
+        # orjson skips surrounding whitespace (the trailing newline) itself,
+        # so no strip() copy; a blank line is just a decode error.
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return None
 
     @staticmethod
     def build_permissions(
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import functools
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Optional
 
 import yaml
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without LibYAML
+    from yaml import SafeLoader
 
-@dataclass
+
+@dataclass(slots=True)
 class RepoConfig:
     name: str
     path: str
@@ -17,10 +23,25 @@ class RepoConfig:
     language: str = "unknown"
     test_cmd: str = ""
     github: str = ""
+    # (path, resolved Path, its str) from the last resolve; resolve() is a
+    # realpath walk, and the pipeline asks for the path many times per repo.
+    _resolved: Optional[tuple[str, Path, str]] = field(
+        default=None, init=False, repr=False, compare=False,
+    )
+
+    def _resolve(self) -> tuple[str, Path, str]:
+        if self._resolved is None or self._resolved[0] != self.path:
+            resolved = Path(self.path).resolve()
+            self._resolved = (self.path, resolved, str(resolved))
+        return self._resolved
 
     @property
     def resolved_path(self) -> Path:
-        return Path(self.path).resolve()
+        return self._resolve()[1]
+
+    @property
+    def resolved_path_str(self) -> str:
+        return self._resolve()[2]
 
     @property
     def is_source(self) -> bool:
@@ -34,6 +55,7 @@ class RepoConfig:
 @dataclass
 class Settings:
     max_parallel: int = 4
+    max_parallel_tests: int = 4
     timeout_per_repo: int = 600
     auto_branch: bool = True
     branch_prefix: str = "cascade/"
@@ -62,13 +84,21 @@ class CascadeConfig:
         return self.repos
 
 
+@functools.lru_cache(maxsize=8)
+def _parse_yaml(path: str, mtime_ns: int) -> Any:
+    """Parse a YAML file; cached per (path, mtime) so edits are picked up."""
+    return yaml.load(Path(path).read_text(), Loader=SafeLoader)
+
+
 def load_config(path: str | Path) -> CascadeConfig:
     """Load a cascade.yaml configuration file."""
     config_path = Path(path).resolve()
     if not config_path.exists():
         raise FileNotFoundError(f"Config file not found: {config_path}")
 
-    raw = yaml.safe_load(config_path.read_text())
+    # The parsed document is cached and shared, so only read from it; the
+    # dataclasses below are rebuilt per call and are safe for callers to mutate.
+    raw = _parse_yaml(str(config_path), config_path.stat().st_mtime_ns)
     if not isinstance(raw, dict):
         raise ValueError(f"Invalid config format in {config_path}")
 
@@ -91,6 +121,7 @@ def load_config(path: str | Path) -> CascadeConfig:
     settings_raw = raw.get("settings", {})
     settings = Settings(
         max_parallel=settings_raw.get("max_parallel", 4),
+        max_parallel_tests=settings_raw.get("max_parallel_tests", 4),
         timeout_per_repo=settings_raw.get("timeout_per_repo", 600),
         auto_branch=settings_raw.get("auto_branch", True),
         branch_prefix=settings_raw.get("branch_prefix", "cascade/"),
@@ -7,24 +7,72 @@ been updated but consumer repos still reference the old schema.
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import bisect
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from pathlib import Path
-from typing import Any
+from typing import Any, Iterator, Optional
 
 from .config import CascadeConfig, RepoConfig
 
+try:
+    import ahocorasick
+except ImportError:  # optional: pip install pyahocorasick
+    ahocorasick = None
+
 OLD_FIELDS = ["first_name", "last_name", "author_first_name", "author_last_name"]
 NEW_FIELDS = ["full_name", "author_name"]
 
+# One alternation over every tracked field; the named group that matched
+# ("old_<field>" / "new_<field>") tells us which kind of reference it is.
+# Field names are ASCII, so files are scanned as raw bytes and only the
+# matched lines are ever decoded.
+ALL_FIELDS = [(f, "old") for f in OLD_FIELDS] + [(f, "new") for f in NEW_FIELDS]
+COMBINED_RE = re.compile("|".join(
+    rf"\b(?P<{kind}_{f}>{re.escape(f)})\b" for f, kind in ALL_FIELDS
+).encode(), re.ASCII)
+_NEWLINE_RE = re.compile(rb"\n")
+# Plain substrings for a C-speed prescreen before entering the regex engine.
+ALL_NEEDLES = tuple(f.encode() for f in OLD_FIELDS + NEW_FIELDS)
+# Bytes that count as "word" characters for \b under re.ASCII.
+_WORD_BYTES = frozenset(
+    b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"
+)
+
+# With pyahocorasick installed, all fields are matched in one pass over a
+# trie instead of through the regex engine.
+if ahocorasick is not None:
+    _AUTOMATON = ahocorasick.Automaton()
+    for _f, _kind in ALL_FIELDS:
+        _AUTOMATON.add_word(_f, (_kind, _f))
+    _AUTOMATON.make_automaton()
+else:
+    _AUTOMATON = None
+
 CODE_EXTENSIONS = {
     ".py", ".js", ".ts", ".jsx", ".tsx", ".html", ".css",
     ".json", ".yaml", ".yml", ".md", ".txt",
 }
 SKIP_DIRS = {".git", "__pycache__", "node_modules", ".pytest_cache", "venv"}
+# Files above this size are lockfiles, bundles or fixtures, not hand-written
+# code worth scanning.
+MAX_SCAN_BYTES = 2 << 20
+
+# Per-kind limit on stored FieldRefs per repo; counts stay exact beyond it.
+MAX_REFS = 1000
+
+# Below this many repos, process-pool startup costs more than the scans.
+PARALLEL_SCAN_MIN_REPOS = 3
 
+# One long-lived scan pool for detect_drift and detect_drift_async, created
+# on first use so each scan does not pay for forking fresh workers.
+_POOL: Optional[ProcessPoolExecutor] = None
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class FieldRef:
     file: str
     line_num: int
@@ -32,7 +80,7 @@ class FieldRef:
     field_name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class RepoAnalysis:
     repo_name: str
     role: str
@@ -40,18 +88,21 @@ class RepoAnalysis:
     old_refs: list[FieldRef] = field(default_factory=list)
     new_refs: list[FieldRef] = field(default_factory=list)
     files_scanned: int = 0
+    old_total: int = 0
+    new_total: int = 0
+    old_files: set[str] = field(default_factory=set)
 
     @property
     def has_old(self) -> bool:
-        return len(self.old_refs) > 0
+        return self.old_total > 0
 
     @property
     def has_new(self) -> bool:
-        return len(self.new_refs) > 0
+        return self.new_total > 0
 
     @property
     def affected_files(self) -> list[str]:
-        return sorted({r.file for r in self.old_refs})
+        return sorted(self.old_files)
 
     def get_display_status(self, source_updated: bool) -> str:
         """Context-aware status that depends on whether source has migrated."""
@@ -77,8 +128,8 @@ class RepoAnalysis:
             "language": self.language,
             "status": self.get_display_status(source_updated),
             "files_scanned": self.files_scanned,
-            "old_field_count": len(self.old_refs),
-            "new_field_count": len(self.new_refs),
+            "old_field_count": self.old_total,
+            "new_field_count": self.new_total,
             "affected_files": self.affected_files,
             "old_refs": [
                 {"file": r.file, "line": r.line_num, "field": r.field_name, "text": r.line_text}
@@ -91,7 +142,7 @@ class RepoAnalysis:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class DriftReport:
     status: str  # "in_sync" | "drift_detected"
     analyses: list[RepoAnalysis] = field(default_factory=list)
@@ -110,8 +161,68 @@ class DriftReport:
         }
 
 
-def _should_skip(path: Path) -> bool:
-    return any(part in SKIP_DIRS for part in path.parts)
+def _iter_code_files(root: str) -> Iterator[str]:
+    """Yield paths of code files under ``root``, pruning SKIP_DIRS as we go
+    and skipping files larger than MAX_SCAN_BYTES."""
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        stack.append(entry.path)
+                    continue
+                name = entry.name
+                dot = name.rfind(".")
+                if dot > 0 and name[dot:] in CODE_EXTENSIONS and entry.is_file():
+                    try:
+                        if entry.stat().st_size > MAX_SCAN_BYTES:
+                            continue
+                    except OSError:
+                        continue
+                    yield entry.path
+
+
+def _line_starts(data: bytes) -> list[int]:
+    """Offsets at which each line of ``data`` begins."""
+    starts = [0]
+    starts.extend(m.end() for m in _NEWLINE_RE.finditer(data))
+    return starts
+
+
+def _line_at(data: bytes, starts: list[int], line_num: int) -> str:
+    """Decode the 1-based ``line_num`` of ``data`` given its line offsets."""
+    begin = starts[line_num - 1]
+    end = starts[line_num] - 1 if line_num < len(starts) else len(data)
+    return data[begin:end].decode("utf-8", errors="replace")
+
+
+def _find_fields_regex(data: bytes) -> Iterator[tuple[int, str, str]]:
+    """Yield ``(offset, kind, field)`` for each whole-word field match."""
+    for m in COMBINED_RE.finditer(data):
+        kind, fname = m.lastgroup.split("_", 1)
+        yield m.start(), kind, fname
+
+
+def _find_fields_aho(data: bytes) -> Iterator[tuple[int, str, str]]:
+    """Aho-Corasick variant of _find_fields_regex with explicit \\b checks."""
+    # latin-1 maps bytes 1:1 onto code points, so offsets are byte offsets.
+    text = data.decode("latin-1")
+    n = len(data)
+    for end, (kind, fname) in _AUTOMATON.iter(text):
+        start = end - len(fname) + 1
+        if start > 0 and data[start - 1] in _WORD_BYTES:
+            continue
+        if end + 1 < n and data[end + 1] in _WORD_BYTES:
+            continue
+        yield start, kind, fname
+
+
+_find_fields = _find_fields_aho if _AUTOMATON is not None else _find_fields_regex
 
 
 def scan_repo(repo: RepoConfig) -> RepoAnalysis:
@@ -123,43 +234,88 @@ def scan_repo(repo: RepoConfig) -> RepoAnalysis:
     if not root.is_dir():
         return analysis
 
-    old_patterns = {f: re.compile(r"\b" + re.escape(f) + r"\b") for f in OLD_FIELDS}
-    new_patterns = {f: re.compile(r"\b" + re.escape(f) + r"\b") for f in NEW_FIELDS}
-
-    for fpath in root.rglob("*"):
-        if not fpath.is_file() or fpath.suffix not in CODE_EXTENSIONS:
-            continue
-        if _should_skip(fpath):
-            continue
-
+    root_str = repo.resolved_path_str
+    prefix_len = len(os.path.join(root_str, ""))
+    for fpath in _iter_code_files(root_str):
         analysis.files_scanned += 1
         try:
-            text = fpath.read_text(errors="replace")
+            with open(fpath, "rb") as fh:
+                data = fh.read()
         except Exception:
             continue
 
-        rel = str(fpath.relative_to(root))
-        for i, line in enumerate(text.splitlines(), 1):
-            for fname, pat in old_patterns.items():
-                if pat.search(line):
-                    analysis.old_refs.append(FieldRef(
-                        file=rel, line_num=i,
-                        line_text=line.strip()[:120], field_name=fname,
-                    ))
-            for fname, pat in new_patterns.items():
-                if pat.search(line):
-                    analysis.new_refs.append(FieldRef(
-                        file=rel, line_num=i,
-                        line_text=line.strip()[:120], field_name=fname,
-                    ))
+        if not any(n in data for n in ALL_NEEDLES):
+            continue
+
+        rel = fpath[prefix_len:]
+        starts: Optional[list[int]] = None
+        seen: set[tuple[int, str]] = set()
+        for offset, kind, fname in _find_fields(data):
+            if starts is None:
+                starts = _line_starts(data)
+            line_num = bisect.bisect_right(starts, offset)
+            if (line_num, fname) in seen:
+                continue
+            seen.add((line_num, fname))
+            if kind == "old":
+                analysis.old_total += 1
+                analysis.old_files.add(rel)
+                refs = analysis.old_refs
+            else:
+                analysis.new_total += 1
+                refs = analysis.new_refs
+            if len(refs) >= MAX_REFS:
+                continue
+            refs.append(FieldRef(
+                file=rel, line_num=line_num,
+                line_text=_line_at(data, starts, line_num).strip()[:120],
+                field_name=fname,
+            ))
 
     return analysis
 
 
+def scan_repos(repos: list[RepoConfig]) -> list[RepoAnalysis]:
+    """Scan repos in parallel worker processes, preserving input order."""
+    if len(repos) < PARALLEL_SCAN_MIN_REPOS:
+        return [scan_repo(r) for r in repos]
+    return list(_get_pool().map(scan_repo, repos))
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        atexit.register(shutdown_pool)
+    return _POOL
+
+
+def shutdown_pool():
+    """Stop the scan pool's workers; the next scan starts a new pool."""
+    global _POOL
+    pool, _POOL = _POOL, None
+    if pool is not None:
+        atexit.unregister(shutdown_pool)
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
 def detect_drift(config: CascadeConfig) -> DriftReport:
     """Compare field usage across all repos to detect schema drift."""
-    analyses = [scan_repo(r) for r in config.repos]
+    return _build_report(scan_repos(config.repos))
+
+
+async def detect_drift_async(config: CascadeConfig) -> DriftReport:
+    """detect_drift for async callers: scans run in a shared process pool so
+    the event loop stays free (e.g. for dashboard WebSocket pushes)."""
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    analyses = await asyncio.gather(*(
+        loop.run_in_executor(pool, scan_repo, r) for r in config.repos
+    ))
+    return _build_report(list(analyses))
+
 
+def _build_report(analyses: list[RepoAnalysis]) -> DriftReport:
     source = next((a for a in analyses if a.role == "source"), None)
     consumers = [a for a in analyses if a.role != "source"]
 
@@ -178,7 +334,7 @@ def detect_drift(config: CascadeConfig) -> DriftReport:
         )
 
     affected = [c for c in consumers if c.has_old]
-    total_old = sum(len(c.old_refs) for c in affected)
+    total_old = sum(c.old_total for c in affected)
 
     if not affected:
         return DriftReport(
@@ -6,9 +6,11 @@ files affected by a change in each repository.
 from __future__ import annotations
 
 import asyncio
+import os
+import re
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
 from .cline import ClineResult, ClineWrapper
 from .config import RepoConfig
@@ -26,6 +28,14 @@ tests, documentation, and configuration files.
 
 Output your analysis as a structured list."""
 
+# Backticked paths, or bare paths following whitespace or a colon. The
+# backtick branch is a lookahead so a path quoted inside it can still be
+# picked up by the bare branch, as when the two were scanned separately.
+_FILE_PATH_RE = re.compile(
+    r'(?=`([^`]+\.[a-zA-Z]{1,10})`)'
+    r'|[\s:]+([a-zA-Z_./][\w./\-]*\.[a-zA-Z]{1,10})'
+)
+
 
 @dataclass
 class DiscoveryResult:
@@ -59,38 +69,41 @@ async def discover_repo(
     prompt_template: Optional[str] = None,
     model: Optional[str] = None,
     on_event: Optional[Callable] = None,
+    prompt: Optional[str] = None,
+    session: Optional[Callable[..., Awaitable[ClineResult]]] = None,
 ) -> DiscoveryResult:
     """
     Run discovery on a single repo using cline --json.
 
     Uses: cline --json -c <repo_path> "discover prompt"
+
+    ``prompt`` (already formatted) and ``session`` (from
+    ``ClineWrapper.session``) let batch callers prepare both once.
     """
-    result = DiscoveryResult(repo_name=repo.name, repo_path=str(repo.resolved_path))
+    repo_root = repo.resolved_path
+    repo_dir = str(repo_root)
+    result = DiscoveryResult(repo_name=repo.name, repo_path=repo_dir)
 
-    template = prompt_template or DISCOVER_PROMPT_TEMPLATE
-    prompt = template.format(change_description=change_description)
+    if prompt is None:
+        prompt = _discover_prompt(change_description, prompt_template)
+    if session is None:
+        session = cline.session(json_output=True, model=model, timeout=120)
 
     if on_event:
         await _emit(on_event, "discovery.started", {
             "repo": repo.name,
-            "path": str(repo.resolved_path),
+            "path": repo_dir,
         })
 
     try:
-        cline_result = await cline.invoke(
-            prompt=prompt,
-            cwd=str(repo.resolved_path),
-            json_output=True,
-            model=model,
-            timeout=120,
-        )
+        cline_result = await session(prompt, cwd=repo_dir)
         result.cline_result = cline_result
         result.duration_seconds = cline_result.duration_seconds
 
         if cline_result.success:
             result.analysis = cline_result.text_output
             result.affected_files = _extract_file_paths(
-                cline_result.text_output, repo.resolved_path
+                cline_result.text_output, repo_root
             )
         else:
             result.error = cline_result.error or "Cline invocation failed"
@@ -104,6 +117,27 @@ async def discover_repo(
     return result
 
 
+async def discover_all_stream(
+    repos: list[RepoConfig],
+    change_description: str,
+    cline: ClineWrapper,
+    prompt_template: Optional[str] = None,
+    model: Optional[str] = None,
+    max_parallel: int = 4,
+    on_event: Optional[Callable] = None,
+) -> AsyncIterator[DiscoveryResult]:
+    """
+    Run discovery across all repos with ``max_parallel`` workers, yielding
+    each result as soon as its repo finishes.
+
+    Results arrive in completion order, not in the order of ``repos``.
+    """
+    async for _, result in _discover_indexed(
+        repos, change_description, cline, prompt_template, model, max_parallel, on_event,
+    ):
+        yield result
+
+
 async def discover_all(
     repos: list[RepoConfig],
     change_description: str,
@@ -113,38 +147,87 @@ async def discover_all(
     max_parallel: int = 4,
     on_event: Optional[Callable] = None,
 ) -> list[DiscoveryResult]:
-    """Run discovery across all repos in parallel."""
-    sem = asyncio.Semaphore(max_parallel)
+    """
+    Run discovery across all repos with ``max_parallel`` workers.
 
-    async def _discover(repo: RepoConfig) -> DiscoveryResult:
-        async with sem:
-            return await discover_repo(
-                repo, change_description, cline, prompt_template, model, on_event,
-            )
+    Results are returned in the same order as ``repos``.
+    """
+    results: list[Optional[DiscoveryResult]] = [None] * len(repos)
+    async for idx, result in _discover_indexed(
+        repos, change_description, cline, prompt_template, model, max_parallel, on_event,
+    ):
+        results[idx] = result
+    return results
 
-    tasks = [asyncio.create_task(_discover(r)) for r in repos]
-    return await asyncio.gather(*tasks)
 
+async def _discover_indexed(
+    repos: list[RepoConfig],
+    change_description: str,
+    cline: ClineWrapper,
+    prompt_template: Optional[str],
+    model: Optional[str],
+    max_parallel: int,
+    on_event: Optional[Callable],
+) -> AsyncIterator[tuple[int, DiscoveryResult]]:
+    todo: asyncio.Queue[tuple[int, RepoConfig]] = asyncio.Queue()
+    for item in enumerate(repos):
+        todo.put_nowait(item)
+    done: asyncio.Queue[tuple[int, DiscoveryResult]] = asyncio.Queue()
+    prompt = _discover_prompt(change_description, prompt_template)
+    session = cline.session(json_output=True, model=model, timeout=120)
+
+    async def _worker():
+        while not todo.empty():
+            idx, repo = todo.get_nowait()
+            try:
+                result = await discover_repo(
+                    repo, change_description, cline, prompt_template, model, on_event,
+                    prompt=prompt, session=session,
+                )
+            except Exception as exc:
+                result = DiscoveryResult(
+                    repo_name=repo.name, repo_path=repo.resolved_path_str, error=str(exc),
+                )
+            done.put_nowait((idx, result))
+
+    workers = [
+        asyncio.create_task(_worker()) for _ in range(min(max_parallel, len(repos)))
+    ]
+    try:
+        for _ in range(len(repos)):
+            yield await done.get()
+    finally:
+        # The consumer may stop early; don't leave workers running.
+        for w in workers:
+            w.cancel()
 
-def _extract_file_paths(text: str, repo_root: Path) -> list[str]:
-    """Heuristic extraction of file paths mentioned in Cline's analysis."""
-    import re
 
-    candidates: list[str] = []
-    patterns = [
-        r'`([^`]+\.[a-zA-Z]{1,10})`',
-        r'[\s:]+([a-zA-Z_./][\w./\-]*\.[a-zA-Z]{1,10})',
-    ]
+def _discover_prompt(change_description: str, prompt_template: Optional[str]) -> str:
+    template = prompt_template or DISCOVER_PROMPT_TEMPLATE
+    return template.format(change_description=change_description)
 
-    for pattern in patterns:
-        for match in re.finditer(pattern, text):
-            path_str = match.group(1).strip()
-            if "/" in path_str or "." in path_str:
-                full = repo_root / path_str
-                if full.exists():
-                    candidates.append(path_str)
 
-    return list(dict.fromkeys(candidates))
+def _extract_file_paths(text: str, repo_root: Path) -> list[str]:
+    """Heuristic extraction of file paths mentioned in Cline's analysis."""
+    candidates = dict.fromkeys(
+        (quoted or bare).strip() for quoted, bare in _FILE_PATH_RE.findall(text)
+    )
+
+    # Check existence with one listdir per parent directory rather than a
+    # stat per candidate; verbose output names the same dirs over and over.
+    root = str(repo_root)
+    listings: dict[str, frozenset[str]] = {}
+    found = []
+    for path_str in candidates:
+        parent, name = os.path.split(os.path.normpath(os.path.join(root, path_str)))
+        if parent not in listings:
+            try:
+                listings[parent] = frozenset(os.listdir(parent))
+            except OSError:
+                listings[parent] = frozenset()
+        if name in listings[parent]:
+            found.append(path_str)
+    return found
 
 
 async def _emit(callback: Callable, event_type: str, data: dict):
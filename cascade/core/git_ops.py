@@ -3,8 +3,12 @@
 from __future__ import annotations
 
 import asyncio
+import os
+import shutil
+import tempfile
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
 
 
 class GitError(Exception):
@@ -14,62 +18,295 @@ class GitError(Exception):
 class GitOps:
     """Async git operations scoped to a specific repository path."""
 
-    def __init__(self, repo_path: str | Path):
+    def __init__(
+        self, repo_path: str | Path, cache_ttl: float = 2.0, stamped_ttl: float = 30.0,
+    ):
         self.repo = Path(repo_path).resolve()
+        self._repo_str = str(self.repo)
+        # Read-only probes that only our own writes can change are memoized;
+        # every mutating method clears the cache. An entry is also tied to
+        # the mtimes of the index, HEAD and ref files (see _stamp), so git
+        # commands run behind our back (by Cline, say) invalidate it too.
+        # That lets entries live for stamped_ttl seconds; without a stamp
+        # (no .git found) they only last cache_ttl. Working-tree probes
+        # (status, unstaged diffs) are never cached: plain file edits touch
+        # none of those files.
+        self._cache: dict[tuple, tuple[float, Optional[tuple], Any]] = {}
+        self._cache_ttl = cache_ttl
+        self._stamped_ttl = stamped_ttl
+        # Concurrent callers of the same probe share one git subprocess.
+        self._inflight: dict[tuple, tuple[Optional[tuple], asyncio.Future]] = {}
+        self._generation = 0
+        self._git_dir: Optional[Path] = None
+        # The branch a run starts from; unlike _cache it survives writes.
+        self._base_branch: Optional[str] = None
 
-    async def _run(self, *args: str, check: bool = True) -> str:
+    def _find_git_dir(self) -> Optional[Path]:
+        dot_git = self.repo / ".git"
+        if dot_git.is_dir():
+            return dot_git
+        if dot_git.is_file():
+            # Linked worktree: ".git" is a "gitdir: <path>" pointer.
+            try:
+                line = dot_git.read_text().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                return (self.repo / line[len("gitdir:"):].strip()).resolve()
+            return None
+        if (self.repo / "HEAD").is_file() and (self.repo / "objects").is_dir():
+            return self.repo  # bare repository
+        return None
+
+    _STAMP_FILES = ("index", "HEAD", "logs/HEAD", "packed-refs")
+
+    def _stamp(self) -> Optional[tuple]:
+        """mtimes of the files git rewrites on index, branch and ref changes."""
+        if self._git_dir is None:
+            self._git_dir = self._find_git_dir()
+            if self._git_dir is None:
+                return None
+        stamp = []
+        for name in self._STAMP_FILES:
+            try:
+                stamp.append(os.stat(self._git_dir / name).st_mtime_ns)
+            except OSError:
+                stamp.append(0)
+        return tuple(stamp)
+
+    async def _cached(self, key: tuple, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        now = time.monotonic()
+        stamp = self._stamp()
+        hit = self._cache.get(key)
+        if hit is not None and hit[1] == stamp:
+            ttl = self._stamped_ttl if stamp is not None else self._cache_ttl
+            if now - hit[0] < ttl:
+                return hit[2]
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] == stamp:
+            pending = inflight[1]
+        else:
+            pending = asyncio.ensure_future(fetch())
+            self._inflight[key] = (stamp, pending)
+            generation = self._generation
+
+            def _done(fut: asyncio.Future, key=key, generation=generation):
+                current = self._inflight.get(key)
+                if current is not None and current[1] is fut:
+                    del self._inflight[key]
+                # A write that landed mid-flight makes the answer stale.
+                if generation == self._generation and not fut.cancelled() and fut.exception() is None:
+                    self._cache[key] = (now, stamp, fut.result())
+
+            pending.add_done_callback(_done)
+        # shield: one caller being cancelled must not cancel the shared probe.
+        return await asyncio.shield(pending)
+
+    async def _run_cached(self, *args: str, check: bool = True) -> str:
+        return await self._cached(args, lambda: self._run(*args, check=check))
+
+    def _invalidate(self):
+        self._cache.clear()
+        self._inflight.clear()
+        self._generation += 1
+        self._git_dir = None  # init or a worktree change may move it
+
+    async def _run_bytes(
+        self, *args: str, env: Optional[dict[str, str]] = None,
+    ) -> tuple[int, bytes, bytes]:
+        """Run git and return ``(returncode, stdout, stderr)`` undecoded."""
+        # Subprocesses here never set preexec_fn, start_new_session or a
+        # user/group, so CPython (3.10+) spawns them with vfork() and skips
+        # copying the parent's page tables. Keep it that way.
         proc = await asyncio.create_subprocess_exec(
             "git", *args,
-            cwd=str(self.repo),
+            cwd=self._repo_str,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE,
+            env={**os.environ, **env} if env else None,
         )
         stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=30)
-        out = stdout.decode("utf-8", errors="replace").strip()
-        err = stderr.decode("utf-8", errors="replace").strip()
-        if check and proc.returncode != 0:
+        return proc.returncode, stdout, stderr
+
+    async def _run(self, *args: str, check: bool = True) -> str:
+        returncode, stdout, stderr = await self._run_bytes(*args)
+        if check and returncode != 0:
+            err = stderr.decode("utf-8", errors="replace").strip()
             raise GitError(f"git {' '.join(args)} failed: {err}")
-        return out
+        return stdout.decode("utf-8", errors="replace").strip()
+
+    async def _run_quiet(self, *args: str):
+        """Run a git write whose output nobody reads; only failures decode."""
+        returncode, _, stderr = await self._run_bytes(*args)
+        if returncode != 0:
+            err = stderr.decode("utf-8", errors="replace").strip()
+            raise GitError(f"git {' '.join(args)} failed: {err}")
+
+    async def _run_lines(self, *args: str, check: bool = True) -> AsyncIterator[str]:
+        """Like _run, but yield stdout line by line instead of buffering it."""
+        proc = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=self._repo_str,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 30
+        err_task = asyncio.ensure_future(proc.stderr.read())
+        try:
+            while line := await asyncio.wait_for(
+                proc.stdout.readline(), timeout=max(0.0, deadline - loop.time()),
+            ):
+                yield line.decode("utf-8", errors="replace").rstrip("\n")
+            await asyncio.wait_for(proc.wait(), timeout=max(0.0, deadline - loop.time()))
+            err = (await err_task).decode("utf-8", errors="replace").strip()
+            if check and proc.returncode != 0:
+                raise GitError(f"git {' '.join(args)} failed: {err}")
+        finally:
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            err_task.cancel()
 
     async def init(self) -> str:
+        self._invalidate()
         return await self._run("init")
 
+    async def probe(self) -> dict[str, Any]:
+        """
+        Answer the basic repo questions with one ``git rev-parse``:
+        ``is_repo``, ``inside_work_tree``, ``is_bare``, ``git_dir`` and
+        ``branch`` (empty before the first commit, when HEAD is unborn).
+        """
+        async def fetch() -> dict[str, Any]:
+            try:
+                returncode, stdout, _ = await self._run_bytes(
+                    "rev-parse", "--is-inside-work-tree", "--is-bare-repository",
+                    "--git-dir", "--abbrev-ref", "HEAD",
+                )
+            except FileNotFoundError:
+                returncode, stdout = -1, b""
+            # Lines come back in argument order. With an unborn HEAD the
+            # first three still print (and "HEAD" is echoed back), so the
+            # branch only counts when the whole call succeeded.
+            lines = stdout.decode("utf-8", errors="replace").splitlines()
+            ok = returncode == 0
+            return {
+                "is_repo": len(lines) >= 3,
+                "inside_work_tree": bool(lines) and lines[0] == "true",
+                "is_bare": len(lines) >= 2 and lines[1] == "true",
+                "git_dir": lines[2] if len(lines) >= 3 else "",
+                "branch": lines[3] if ok and len(lines) >= 4 else "",
+            }
+
+        return await self._cached(("probe",), fetch)
+
     async def current_branch(self) -> str:
-        return await self._run("rev-parse", "--abbrev-ref", "HEAD")
+        info = await self.probe()
+        if not info["branch"]:
+            raise GitError("git rev-parse --abbrev-ref HEAD failed: no current branch")
+        return info["branch"]
+
+    async def base_branch(self) -> str:
+        """
+        The branch that was checked out the first time this is called.
+        Remembered for the lifetime of the GitOps, so it stays put while a
+        run moves between its own branches.
+        """
+        if self._base_branch is None:
+            self._base_branch = await self.current_branch()
+        return self._base_branch
 
     async def has_repo(self) -> bool:
+        return (await self.probe())["is_repo"]
+
+    async def is_bare(self) -> bool:
+        return (await self.probe())["is_bare"]
+
+    async def add_worktree(self, branch: str, path: Optional[str | Path] = None) -> GitOps:
+        """
+        Check ``branch`` out into a separate worktree, creating the branch
+        from HEAD if it does not exist yet, and return a GitOps for it.
+        ``path`` defaults to a fresh temporary directory.
+        """
+        wt = Path(path) if path else Path(tempfile.mkdtemp(prefix="cascade-wt-"))
+        self._invalidate()
         try:
-            await self._run("rev-parse", "--git-dir")
-            return True
-        except (GitError, FileNotFoundError):
-            return False
+            try:
+                await self._run_quiet("worktree", "add", "-b", branch, str(wt))
+            except GitError:
+                await self._run_quiet("worktree", "add", str(wt), branch)
+        except Exception:
+            if path is None:
+                shutil.rmtree(wt, ignore_errors=True)
+            raise
+        return GitOps(wt, cache_ttl=self._cache_ttl, stamped_ttl=self._stamped_ttl)
+
+    async def remove_worktree(self, path: str | Path):
+        """Delete a worktree made by add_worktree, discarding its changes."""
+        self._invalidate()
+        await self._run_quiet("worktree", "remove", "--force", str(path))
 
     async def create_branch(self, name: str) -> str:
+        self._invalidate()
         return await self._run("checkout", "-b", name)
 
     async def checkout(self, branch: str) -> str:
+        self._invalidate()
         return await self._run("checkout", branch)
 
     async def stage_all(self) -> str:
+        self._invalidate()
         return await self._run("add", "-A")
 
     async def commit(self, message: str) -> str:
+        self._invalidate()
         return await self._run("commit", "-m", message)
 
     async def has_changes(self) -> bool:
         """Check for staged or unstaged changes."""
-        result = await self._run("status", "--porcelain", check=False)
-        return bool(result.strip())
-
-    async def has_staged_changes(self) -> bool:
+        # Only whether anything is printed matters: look at the first byte
+        # and discard the rest without collecting it. Rename detection is
+        # skipped and --no-optional-locks keeps status from rewriting the
+        # index. git is drained rather than signalled so it exits cleanly.
         proc = await asyncio.create_subprocess_exec(
-            "git", "diff", "--cached", "--quiet",
-            cwd=str(self.repo),
+            "git", "--no-optional-locks", "status", "--porcelain=v2", "-z", "--no-renames",
+            cwd=self._repo_str,
             stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
         )
-        await proc.wait()
-        return proc.returncode != 0
+
+        async def first_byte() -> bool:
+            try:
+                await proc.stdout.readexactly(1)
+            except asyncio.IncompleteReadError:
+                return False
+            while await proc.stdout.read(65536):
+                pass
+            return True
+
+        try:
+            changed = await asyncio.wait_for(first_byte(), timeout=30)
+        finally:
+            if proc.returncode is None and proc.stdout.at_eof():
+                await proc.wait()
+            elif proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+        return changed
+
+    async def has_staged_changes(self) -> bool:
+        async def probe() -> bool:
+            proc = await asyncio.create_subprocess_exec(
+                "git", "diff", "--cached", "--quiet",
+                cwd=self._repo_str,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            await proc.wait()
+            return proc.returncode != 0
+
+        return await self._cached(("has_staged_changes",), probe)
 
     async def diff(self, staged: bool = False) -> str:
         args = ["diff"]
@@ -78,25 +315,57 @@ class GitOps:
         return await self._run(*args)
 
     async def diff_stat(self, staged: bool = False) -> str:
-        args = ["diff", "--stat"]
         if staged:
-            args.append("--cached")
-        return await self._run(*args)
+            return await self._run_cached("diff", "--stat", "--cached")
+        return await self._run("diff", "--stat")
 
     async def diff_name_only(self, staged: bool = False) -> list[str]:
-        args = ["diff", "--name-only"]
         if staged:
-            args.append("--cached")
-        result = await self._run(*args)
-        return [f for f in result.splitlines() if f.strip()]
+            files, _ = await self.staged_summary()
+            return list(files)
+        return [f async for f in self._run_lines("diff", "--name-only") if f.strip()]
+
+    async def staged_summary(self) -> tuple[list[str], str]:
+        """
+        ``(files, stat)`` for the index in one ``git diff --cached``: what
+        ``diff_name_only(staged=True)`` and ``diff_stat(staged=True)`` return.
+        ``files`` is empty exactly when ``has_staged_changes()`` is False.
+        """
+        async def fetch() -> tuple[list[str], str]:
+            args = ("diff", "--cached", "--numstat", "--stat", "-z")
+            returncode, out, stderr = await self._run_bytes(*args)
+            if returncode != 0:
+                err = stderr.decode("utf-8", errors="replace").strip()
+                raise GitError(f"git {' '.join(args)} failed: {err}")
+            # -z numstat records come first: "added\tdeleted\tpath\0", or for
+            # a rename "added\tdeleted\t\0old\0new\0". The --stat text follows.
+            files: list[str] = []
+            pos = 0
+            while True:
+                end = out.find(b"\0", pos)
+                if end < 0 or out.count(b"\t", pos, end) < 2:
+                    break
+                path = out[pos:end].split(b"\t", 2)[2]
+                pos = end + 1
+                if not path:
+                    old_end = out.index(b"\0", pos)
+                    end = out.index(b"\0", old_end + 1)
+                    path = out[old_end + 1:end]
+                    pos = end + 1
+                files.append(path.decode("utf-8", errors="replace"))
+            return files, out[pos:].decode("utf-8", errors="replace").strip()
+
+        return await self._cached(("staged_summary",), fetch)
 
     async def log_oneline(self, n: int = 5) -> str:
-        return await self._run("log", "--oneline", f"-{n}", check=False)
+        return await self._run_cached("log", "--oneline", f"-{n}", check=False)
 
     async def stash(self) -> str:
+        self._invalidate()
         return await self._run("stash")
 
     async def stash_pop(self) -> str:
+        self._invalidate()
         return await self._run("stash", "pop")
 
     async def push(self, remote: str = "origin", branch: Optional[str] = None) -> str:
@@ -105,18 +374,27 @@ class GitOps:
             args.append(branch)
         else:
             args.append("HEAD")
+        self._invalidate()
         return await self._run(*args)
 
     async def ensure_clean(self) -> bool:
         """Stash any uncommitted changes and return True if stash was needed."""
-        if await self.has_changes():
-            await self.stash()
-            return True
-        return False
+        # One stash call instead of status + stash. git exits 0 whether or
+        # not anything was saved, so tell the cases apart by its (untranslated)
+        # message. Untracked files count as changes, as in has_changes.
+        self._invalidate()
+        returncode, stdout, stderr = await self._run_bytes(
+            "stash", "push", "--include-untracked", env={"LC_ALL": "C"},
+        )
+        if returncode != 0:
+            err = stderr.decode("utf-8", errors="replace").strip()
+            raise GitError(f"git stash push failed: {err}")
+        return b"No local changes to save" not in stdout
 
     async def ensure_repo(self):
         """Ensure the directory is a git repo, init if not."""
         if not await self.has_repo():
-            await self.init()
-            await self.stage_all()
-            await self.commit("initial commit")
+            self._invalidate()
+            await self._run_quiet("init")
+            await self._run_quiet("add", "-A")
+            await self._run_quiet("commit", "-m", "initial commit")
@@ -1,17 +1,29 @@
 """
 GitHub operations for Cascade -- clone repos, push branches, create PRs.
 
-Uses git CLI for clone/push and gh CLI for PR creation.
+Uses git CLI for clone/push. PRs are created through one keep-alive HTTPS
+session to the GitHub API when $GITHUB_TOKEN (or $GH_TOKEN) is set and
+httpx is installed, and through the gh CLI otherwise.
 """
 
 from __future__ import annotations
 
 import asyncio
+import importlib.util
+import json
+import os
 import re
 import shutil
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+from .git_ops import GitOps
+
+try:
+    import httpx
+except ImportError:  # optional: PRs then go through the gh CLI
+    httpx = None
 
 
 @dataclass
@@ -44,24 +56,52 @@ class PRResult:
         }
 
 
-async def _run(cmd: list[str], cwd: Optional[str] = None, timeout: int = 120) -> tuple[int, str, str]:
+@dataclass
+class PRSpec:
+    """One pull request to open; owner/name default to the origin remote."""
+
+    repo_dir: str
+    head: str
+    title: str
+    body: str
+    base: str = "main"
+    owner: str = ""
+    name: str = ""
+
+
+async def _run_bytes(
+    cmd: list[str],
+    cwd: Optional[str] = None,
+    timeout: int = 120,
+    stdin: Optional[bytes] = None,
+) -> tuple[int, bytes, bytes]:
     proc = await asyncio.create_subprocess_exec(
         *cmd,
         cwd=cwd,
+        stdin=asyncio.subprocess.PIPE if stdin is not None else None,
         stdout=asyncio.subprocess.PIPE,
         stderr=asyncio.subprocess.PIPE,
     )
     try:
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
-        return (
-            proc.returncode or 0,
-            stdout.decode("utf-8", errors="replace").strip(),
-            stderr.decode("utf-8", errors="replace").strip(),
-        )
+        stdout, stderr = await asyncio.wait_for(proc.communicate(stdin), timeout=timeout)
+        return proc.returncode or 0, stdout, stderr
     except asyncio.TimeoutError:
         proc.kill()
         await proc.wait()
-        return 1, "", "Command timed out"
+        return 1, b"", b"Command timed out"
+
+
+async def _run(cmd: list[str], cwd: Optional[str] = None, timeout: int = 120) -> tuple[int, str, str]:
+    ret, stdout, stderr = await _run_bytes(cmd, cwd=cwd, timeout=timeout)
+    return (
+        ret,
+        stdout.decode("utf-8", errors="replace").strip(),
+        stderr.decode("utf-8", errors="replace").strip(),
+    )
+
+
+_GITHUB_URL_RE = re.compile(r"github\.com[:/]([\w.-]+)/([\w.-]+?)(?:\.git)?$")
+_GITHUB_SHORT_RE = re.compile(r"([\w.-]+)/([\w.-]+)")
 
 
 def parse_github_url(url: str) -> tuple[str, str]:
@@ -75,13 +115,14 @@ def parse_github_url(url: str) -> tuple[str, str]:
     """
     url = url.strip().rstrip("/")
 
-    match = re.match(r"^([\w.-]+)/([\w.-]+)$", url)
+    # Full URLs are the common case; the two forms never overlap.
+    match = _GITHUB_URL_RE.search(url)
     if match:
-        return match.group(1), match.group(2).removesuffix(".git")
+        return match.group(1), match.group(2)
 
-    match = re.search(r"github\.com[:/]([\w.-]+)/([\w.-]+?)(?:\.git)?$", url)
+    match = _GITHUB_SHORT_RE.fullmatch(url)
     if match:
-        return match.group(1), match.group(2)
+        return match.group(1), match.group(2).removesuffix(".git")
 
     return "", url
 
@@ -97,28 +138,42 @@ def normalize_clone_url(url: str) -> str:
 async def clone_repo(
     github_url: str,
     workspace_dir: str | Path,
-    depth: int = 0,
+    depth: int = 1,
+    filter_blobs: bool = True,
 ) -> CloneResult:
-    """Clone a GitHub repo into the workspace directory."""
+    """
+    Clone a GitHub repo into the workspace directory.
+
+    Cascade only edits the current tree and pushes a branch, so by default
+    only the default branch's tip is fetched (``--single-branch --depth=1``)
+    and blobs are downloaded lazily (``--filter=blob:none``). Pass
+    ``depth=0`` for full history; git fetches any missing blobs on demand
+    if later commands such as ``git log -p`` need them.
+    """
     owner, repo_name = parse_github_url(github_url)
     clone_url = normalize_clone_url(github_url)
     target = Path(workspace_dir) / repo_name
 
     result = CloneResult(repo_url=github_url, name=repo_name)
+    # Whatever is at target after this call may be a different repo.
+    _default_branches.pop(str(target), None)
 
     if target.exists() and (target / ".git").is_dir():
-        ret, out, err = await _run(["git", "pull", "--rebase"], cwd=str(target))
+        pull = ["git", "pull", "--rebase"]
+        # Keep shallow clones shallow; never truncate an existing full clone.
+        if depth > 0 and (target / ".git" / "shallow").exists():
+            pull.append(f"--depth={depth}")
+        await _run_bytes(pull, cwd=str(target))
         result.local_path = str(target)
         result.success = True
-        ret2, branch, _ = await _run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=str(target),
-        )
-        result.default_branch = branch or "main"
+        result.default_branch = (await GitOps(target).probe())["branch"] or "main"
         return result
 
     target.mkdir(parents=True, exist_ok=True)
 
-    cmd = ["git", "clone"]
+    cmd = ["git", "clone", "--single-branch"]
+    if filter_blobs:
+        cmd.append("--filter=blob:none")
     if depth > 0:
         cmd.extend(["--depth", str(depth)])
     cmd.extend([clone_url, str(target)])
@@ -131,19 +186,16 @@ async def clone_repo(
 
     result.local_path = str(target)
     result.success = True
-
-    ret2, branch, _ = await _run(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=str(target),
-    )
-    result.default_branch = branch or "main"
+    result.default_branch = (await GitOps(target).probe())["branch"] or "main"
 
     return result
 
 
 async def push_branch(repo_dir: str, branch: str) -> tuple[bool, str]:
-    """Push a branch to origin."""
+    """Push a local branch to origin; it need not be checked out."""
+    ref = f"refs/heads/{branch}"
     ret, out, err = await _run(
-        ["git", "push", "-u", "origin", branch],
+        ["git", "push", "-u", "origin", f"{ref}:{ref}"],
         cwd=repo_dir,
         timeout=60,
     )
@@ -152,6 +204,88 @@ async def push_branch(repo_dir: str, branch: str) -> tuple[bool, str]:
     return True, out
 
 
+_GH_PATH: Optional[str] = None
+_GH_CHECKED = False
+
+
+def _gh_path() -> Optional[str]:
+    """Absolute path of the gh CLI, looked up on PATH once per process."""
+    global _GH_PATH, _GH_CHECKED
+    if not _GH_CHECKED:
+        _GH_PATH = shutil.which("gh")
+        _GH_CHECKED = True
+    return _GH_PATH
+
+
+GITHUB_API = "https://api.github.com"
+
+# (event loop, client): an AsyncClient's connections belong to one loop.
+_HTTP: Optional[tuple[asyncio.AbstractEventLoop, Any]] = None
+
+
+def _github_http() -> Optional[Any]:
+    """
+    The shared GitHub API session for the running event loop, or None when
+    there is no token or httpx is missing. Reusing it keeps one TLS
+    connection open across PRs instead of a fresh gh process (and
+    handshake) per call.
+    """
+    global _HTTP
+    token = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN")
+    if httpx is None or not token:
+        return None
+    loop = asyncio.get_running_loop()
+    if _HTTP is None or _HTTP[0] is not loop:
+        _HTTP = (loop, httpx.AsyncClient(
+            base_url=GITHUB_API,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+            },
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=30.0,
+        ))
+    return _HTTP[1]
+
+
+async def close_github_http():
+    """Close the shared GitHub API session, if this loop opened one."""
+    global _HTTP
+    if _HTTP is not None:
+        loop, client = _HTTP
+        _HTTP = None
+        if loop is asyncio.get_running_loop():
+            await client.aclose()
+
+
+async def _create_pr_http(
+    client: Any, result: PRResult, owner: str, name: str,
+    title: str, body: str, base: str, head: str,
+) -> PRResult:
+    try:
+        resp = await client.post(
+            f"/repos/{owner}/{name}/pulls",
+            json={"title": title, "body": body, "base": base, "head": head},
+        )
+        data = resp.json()
+    except (httpx.HTTPError, ValueError) as exc:
+        result.error = f"GitHub API request failed: {exc}"
+        return result
+
+    if resp.status_code != 201:
+        details = "; ".join(
+            e.get("message", "") for e in data.get("errors") or [] if isinstance(e, dict)
+        )
+        message = data.get("message") or f"HTTP {resp.status_code}"
+        result.error = f"{message}: {details}" if details else message
+        return result
+
+    result.success = True
+    result.pr_url = data["html_url"]
+    result.pr_number = data["number"]
+    return result
+
+
 async def create_pr(
     repo_dir: str,
     title: str,
@@ -159,16 +293,23 @@ async def create_pr(
     base: str = "main",
     head: Optional[str] = None,
 ) -> PRResult:
-    """Create a GitHub PR using the gh CLI."""
+    """Create a GitHub PR via the shared API session, else the gh CLI."""
     repo_name = Path(repo_dir).name
     result = PRResult(repo_name=repo_name, branch=head or "")
 
-    if not shutil.which("gh"):
+    client = _github_http()
+    if client is not None and head:
+        owner, name = await _repo_slug(repo_dir)
+        if owner:
+            return await _create_pr_http(client, result, owner, name, title, body, base, head)
+
+    gh = _gh_path()
+    if not gh:
         result.error = "gh CLI not installed (install from https://cli.github.com)"
         return result
 
     cmd = [
-        "gh", "pr", "create",
+        gh, "pr", "create",
         "--title", title,
         "--body", body,
         "--base", base,
@@ -192,34 +333,214 @@ async def create_pr(
     return result
 
 
+def _gql(value: str) -> str:
+    # JSON string literals are valid GraphQL string literals.
+    return json.dumps(value)
+
+
+async def _repo_slug(repo_dir: str) -> tuple[str, str]:
+    _, url, _ = await _run(["git", "remote", "get-url", "origin"], cwd=repo_dir)
+    return parse_github_url(url)
+
+
+async def _origin_slug(spec: PRSpec) -> tuple[str, str]:
+    if spec.owner and spec.name:
+        return spec.owner, spec.name
+    return await _repo_slug(spec.repo_dir)
+
+
+async def _graphql(gh: Optional[str], query: str) -> dict[str, Any]:
+    """Run one GraphQL document on the shared API session or ``gh api graphql``.
+
+    gh exits non-zero when any aliased field errors but still prints the
+    response, so the body is parsed regardless of the exit code.
+    """
+    client = _github_http()
+    if client is not None:
+        try:
+            resp = await client.post("/graphql", json={"query": query})
+            return resp.json()
+        except (httpx.HTTPError, ValueError) as exc:
+            return {"errors": [{"message": f"GitHub API request failed: {exc}"}]}
+
+    _, out, err = await _run_bytes(
+        [gh, "api", "graphql", "-F", "query=@-"], timeout=60, stdin=query.encode(),
+    )
+    try:
+        return json.loads(out)
+    except ValueError:
+        return {"errors": [{"message": err.decode("utf-8", errors="replace").strip()}]}
+
+
+def _alias_errors(response: dict[str, Any]) -> dict[str, str]:
+    errors: dict[str, str] = {}
+    for e in response.get("errors") or []:
+        for alias in (e.get("path") or [])[:1]:
+            errors.setdefault(alias, e.get("message", "GraphQL error"))
+    return errors
+
+
+async def _create_each(specs: list[PRSpec]) -> list[PRResult]:
+    return list(await asyncio.gather(*(
+        create_pr(sp.repo_dir, sp.title, sp.body, base=sp.base, head=sp.head)
+        for sp in specs
+    )))
+
+
+async def create_prs_batch(specs: list[PRSpec]) -> list[PRResult]:
+    """
+    Create several PRs with two GraphQL requests in total -- one to look up
+    the repository IDs, one aliased mutation creating every PR -- instead
+    of one ``gh pr create`` per repo.
+
+    Falls back to per-repo create_pr for a single PR, or when the batch
+    itself can't be run (no GitHub remote, GraphQL unavailable).
+    """
+    gh = _gh_path()
+    if len(specs) <= 1 or not (gh or _github_http()):
+        return await _create_each(specs)
+
+    slugs = await asyncio.gather(*(_origin_slug(sp) for sp in specs))
+    if not all(owner for owner, _ in slugs):
+        return await _create_each(specs)
+
+    lookup = await _graphql(gh, "query { " + " ".join(
+        f"r{i}: repository(owner: {_gql(owner)}, name: {_gql(name)}) {{ id }}"
+        for i, (owner, name) in enumerate(slugs)
+    ) + " }")
+    repos = lookup.get("data") or {}
+    if not repos:
+        return await _create_each(specs)
+    lookup_errors = _alias_errors(lookup)
+
+    results = [PRResult(repo_name=Path(sp.repo_dir).name, branch=sp.head) for sp in specs]
+    mutations: dict[int, str] = {}
+    for i, sp in enumerate(specs):
+        repo = repos.get(f"r{i}")
+        if not repo:
+            results[i].error = lookup_errors.get(f"r{i}", "Repository not found")
+            continue
+        mutations[i] = (
+            f"pr{i}: createPullRequest(input: {{"
+            f"repositoryId: {_gql(repo['id'])}, baseRefName: {_gql(sp.base)}, "
+            f"headRefName: {_gql(sp.head)}, title: {_gql(sp.title)}, body: {_gql(sp.body)}"
+            "}) { pullRequest { url number } }"
+        )
+    if not mutations:
+        return results
+
+    created = await _graphql(gh, "mutation { " + " ".join(mutations.values()) + " }")
+    data = created.get("data")
+    if data is None:
+        # Nothing ran (bad auth, unparsable response): no PR exists yet, so
+        # retrying one by one cannot create duplicates.
+        singles = await _create_each([specs[i] for i in mutations])
+        for i, result in zip(mutations, singles):
+            results[i] = result
+        return results
+
+    errors = _alias_errors(created)
+    for i in mutations:
+        pr = (data.get(f"pr{i}") or {}).get("pullRequest")
+        if pr:
+            results[i].success = True
+            results[i].pr_url = pr["url"]
+            results[i].pr_number = pr["number"]
+        else:
+            results[i].error = errors.get(f"pr{i}", "createPullRequest failed")
+    return results
+
+
+async def push_and_pr_all(
+    jobs: list[tuple[str, str, str, str, str]],
+    max_parallel: int = 4,
+    on_event: Optional[Callable] = None,
+) -> list[PRResult]:
+    """
+    Push each ``(repo_dir, branch, title, body, base)`` job and open its PR.
+
+    Pushes are network-bound, so they run concurrently (up to
+    ``max_parallel`` at a time); the PRs for every successful push are then
+    created in one batch. Results keep the order of ``jobs``; a failed push
+    yields a PRResult carrying the push error.
+    """
+    sem = asyncio.Semaphore(max_parallel)
+
+    async def emit(event_type: str, data: dict):
+        if on_event:
+            try:
+                res = on_event(event_type, data)
+                if asyncio.iscoroutine(res):
+                    await res
+            except Exception:
+                pass
+
+    async def push(repo_dir: str, branch: str) -> Optional[str]:
+        async with sem:
+            await emit("github.pushing", {"repo": Path(repo_dir).name, "branch": branch})
+            ok, push_err = await push_branch(repo_dir, branch)
+        return None if ok else push_err
+
+    push_errors = await asyncio.gather(*(push(job[0], job[1]) for job in jobs))
+
+    results: list[Optional[PRResult]] = [None] * len(jobs)
+    specs: list[PRSpec] = []
+    pushed: list[int] = []
+    for i, ((repo_dir, branch, title, body, base), push_err) in enumerate(zip(jobs, push_errors)):
+        if push_err is not None:
+            results[i] = PRResult(
+                repo_name=Path(repo_dir).name, branch=branch, error=f"Push failed: {push_err}",
+            )
+            continue
+        await emit("github.creating_pr", {"repo": Path(repo_dir).name, "branch": branch})
+        specs.append(PRSpec(repo_dir=repo_dir, head=branch, title=title, body=body, base=base))
+        pushed.append(i)
+
+    for i, result in zip(pushed, await create_prs_batch(specs)):
+        results[i] = result
+        await emit("github.pr_created", result.to_dict())
+    return results
+
+
+_EXT_TO_LANG = {
+    ".py": "python", ".js": "javascript", ".ts": "typescript",
+    ".rb": "ruby", ".rs": "rust", ".go": "go", ".java": "java",
+}
+
+
+def _scan_repo_top(repo_dir: str) -> tuple[frozenset[str], frozenset[str]]:
+    """Names and extensions of the entries at the top of ``repo_dir``."""
+    try:
+        names = frozenset(os.listdir(repo_dir))
+    except OSError:
+        return frozenset(), frozenset()
+    exts = frozenset(n[n.rfind("."):] for n in names if "." in n)
+    return names, exts
+
+
 async def detect_language(repo_dir: str) -> str:
     """Heuristic language detection based on files present."""
-    p = Path(repo_dir)
-    if (p / "package.json").exists():
+    files, exts = _scan_repo_top(repo_dir)
+    if "package.json" in files:
         return "javascript"
-    if (p / "Cargo.toml").exists():
+    if "Cargo.toml" in files:
         return "rust"
-    if (p / "go.mod").exists():
+    if "go.mod" in files:
         return "go"
-    if (p / "pom.xml").exists() or (p / "build.gradle").exists():
+    if "pom.xml" in files or "build.gradle" in files:
         return "java"
-    for ext in [".py", ".js", ".ts", ".rb", ".rs", ".go", ".java"]:
-        if list(p.glob(f"*{ext}")):
-            return {
-                ".py": "python", ".js": "javascript", ".ts": "typescript",
-                ".rb": "ruby", ".rs": "rust", ".go": "go", ".java": "java",
-            }.get(ext, "unknown")
-    return "unknown"
+    return next((lang for ext, lang in _EXT_TO_LANG.items() if ext in exts), "unknown")
 
 
 async def detect_test_cmd(repo_dir: str, language: str) -> str:
     """Heuristic test command detection."""
-    p = Path(repo_dir)
     if language == "python":
-        if (p / "pytest.ini").exists() or (p / "pyproject.toml").exists() or (p / "setup.py").exists():
+        files, _ = _scan_repo_top(repo_dir)
+        if not files.isdisjoint(("pytest.ini", "pyproject.toml", "setup.py")):
             return "python -m pytest -v"
     if language in ("javascript", "typescript"):
-        if (p / "package.json").exists():
+        files, _ = _scan_repo_top(repo_dir)
+        if "package.json" in files:
             return "npm test"
     if language == "rust":
         return "cargo test"
@@ -228,9 +549,22 @@ async def detect_test_cmd(repo_dir: str, language: str) -> str:
     return ""
 
 
+# repo_dir -> (git stamp, branch). The stamp (HEAD / packed-refs / index
+# mtimes) changes on checkout or re-clone, so a long-lived dashboard never
+# serves a branch from an earlier clone; clone_repo also drops the entry.
+_default_branches: dict[str, tuple[Optional[tuple], str]] = {}
+
+
 async def get_repo_default_branch(repo_dir: str) -> str:
     """Get the default branch name."""
-    ret, out, _ = await _run(
-        ["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_dir,
-    )
-    return out if ret == 0 and out else "main"
+    git = GitOps(repo_dir)
+    stamp = git._stamp()
+    cached = _default_branches.get(repo_dir)
+    if cached is not None and stamp is not None and cached[0] == stamp:
+        return cached[1]
+    branch = (await git.probe())["branch"]
+    if branch:
+        _default_branches[repo_dir] = (stamp, branch)
+        return branch
+    _default_branches.pop(repo_dir, None)
+    return "main"
@@ -2,7 +2,7 @@
 Propagator -- the orchestration engine of Cascade.
 
 For each repository, runs a multi-stage pipeline:
-  1. Branch  →  create isolated git branch
+  1. Branch  →  create isolated git branch (a worktree for bare repos)
   2. Adapt   →  cline -y to implement the change
   3. Test    →  run repo's test command
   4. Fix     →  if tests fail, pipe output to cline -y for repair (retry)
@@ -13,7 +13,10 @@ For each repository, runs a multi-stage pipeline:
 from __future__ import annotations
 
 import asyncio
+import re
+import shlex
 import time
+from collections import deque
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Callable, Optional
@@ -21,6 +24,7 @@ from typing import Any, Callable, Optional
 from .cline import ClineResult, ClineWrapper
 from .config import CascadeConfig, RepoConfig
 from .git_ops import GitOps
+from .github_ops import create_pr, push_branch
 
 
 # ── Status constants ──────────────────────────────────────────────
@@ -38,6 +42,8 @@ class Status:
     FAILED = "failed"
     SKIPPED = "skipped"
 
+    TERMINAL = frozenset({DONE, FAILED, SKIPPED})
+
 
 # ── Per-repo result ──────────────────────────────────────────────
 
@@ -60,6 +66,21 @@ class RepoResult:
     retries_used: int = 0
     pr_url: str = ""
     pushed: bool = False
+    # Serialized form of everything but the (time-dependent) duration;
+    # dropped whenever a field is reassigned. Fields are only ever replaced,
+    # never mutated in place, so assignment is the one place to invalidate.
+    _dict_cache: Optional[dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False,
+    )
+
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        if name != "_dict_cache":
+            object.__setattr__(self, "_dict_cache", None)
+        # Pin the end time as soon as the repo is done, so duration stops
+        # calling time.time() even before finished_at is set explicitly.
+        if name == "status" and value in Status.TERMINAL and not self.finished_at:
+            object.__setattr__(self, "finished_at", time.time())
 
     @property
     def duration(self) -> float:
@@ -71,12 +92,16 @@ class RepoResult:
         return self.status == Status.DONE
 
     def to_dict(self) -> dict[str, Any]:
+        if self._dict_cache is None:
+            self._dict_cache = self._build_dict()
+        return {**self._dict_cache, "duration_seconds": self.duration}
+
+    def _build_dict(self) -> dict[str, Any]:
         return {
             "repo_name": self.repo_name,
             "language": self.language,
             "status": self.status,
             "branch": self.branch,
-            "duration_seconds": self.duration,
             "test_passed": self.test_passed,
             "files_changed": self.files_changed,
             "diff_stat": self.diff_stat,
@@ -96,6 +121,12 @@ class CascadeResult:
     repo_results: list[RepoResult] = field(default_factory=list)
     started_at: float = 0.0
     finished_at: float = 0.0
+    # Payload of a finished run, keyed on (finished_at, repo count). It is
+    # built once for cascade.completed and reused by later readers, such
+    # as the dashboard's run history.
+    _final_dict: Optional[tuple[tuple[float, int], dict[str, Any]]] = field(
+        default=None, init=False, repr=False, compare=False,
+    )
 
     @property
     def duration(self) -> float:
@@ -110,14 +141,111 @@ class CascadeResult:
         return sum(1 for r in self.repo_results if r.status == Status.FAILED)
 
     def to_dict(self) -> dict[str, Any]:
-        return {
+        key = (self.finished_at, len(self.repo_results))
+        if self.finished_at and self._final_dict is not None and self._final_dict[0] == key:
+            return self._final_dict[1]
+
+        # One pass for the counts and the repo payloads.
+        repos = []
+        success = failed = 0
+        for r in self.repo_results:
+            if r.status == Status.DONE:
+                success += 1
+            elif r.status == Status.FAILED:
+                failed += 1
+            repos.append(r.to_dict())
+        payload = {
             "change_description": self.change_description[:200],
             "duration_seconds": self.duration,
             "repos_total": len(self.repo_results),
-            "repos_success": self.success_count,
-            "repos_failed": self.fail_count,
-            "repos": [r.to_dict() for r in self.repo_results],
+            "repos_success": success,
+            "repos_failed": failed,
+            "repos": repos,
         }
+        if self.finished_at:
+            self._final_dict = (key, payload)
+        return payload
+
+
+# ── Test command parsing ─────────────────────────────────────────
+
+# Lines of test output kept for results and fix prompts.
+TEST_OUTPUT_LINES = 2000
+
+# Outside quotes, anything the shell would interpret (pipes, redirects,
+# globs, chaining, comments, ...) keeps the command on the /bin/sh path.
+# Inside double quotes only expansions and escapes do.
+_SHELL_CHARS = frozenset("|&;<>()$`\\*?[]{}~!#\n")
+_DQUOTE_SHELL_CHARS = frozenset("$`\\!")
+# Words that only mean something to the shell: POSIX special builtins,
+# reserved words and common regular builtins. This only saves a failed
+# exec; anything not found on disk is retried through the shell anyway.
+_SHELL_BUILTINS = frozenset({
+    ".", ":", "break", "continue", "eval", "exec", "exit", "export",
+    "readonly", "return", "set", "shift", "times", "trap", "unset",
+    "!", "{", "case", "do", "done", "elif", "else", "esac", "fi", "for",
+    "if", "in", "then", "until", "while", "time",
+    "alias", "bg", "cd", "command", "fc", "fg", "getopts", "hash", "jobs",
+    "kill", "read", "source", "type", "ulimit", "umask", "unalias", "wait",
+})
+
+
+def _needs_shell(cmd: str) -> bool:
+    quote = ""
+    for ch in cmd:
+        if quote == "'":
+            if ch == "'":
+                quote = ""
+        elif quote == '"':
+            if ch == '"':
+                quote = ""
+            elif ch in _DQUOTE_SHELL_CHARS:
+                return True
+        elif ch in "'\"":
+            quote = ch
+        elif ch in _SHELL_CHARS:
+            return True
+    return bool(quote)  # unbalanced quotes: let the shell report it
+
+
+def _plain_argv(cmd: str) -> Optional[list[str]]:
+    """argv for a test command that needs no shell, else None."""
+    if _needs_shell(cmd):
+        return None
+    argv = shlex.split(cmd)
+    if not argv or "=" in argv[0] or argv[0] in _SHELL_BUILTINS:
+        return None
+    return argv
+
+
+# ── Prompt templates ─────────────────────────────────────────────
+
+# The {{PLACEHOLDER}}s a user-supplied prompt template may contain.
+_PLACEHOLDER_RE = re.compile(r"(\{\{(?:CHANGE|REPO_NAME|LANGUAGE|TEST_OUTPUT)\}\})")
+
+
+def _compile_template(template: Optional[str]) -> Optional[list[str]]:
+    """Split a template once into alternating literal / placeholder tokens."""
+    if not template:
+        return None
+    return _PLACEHOLDER_RE.split(template)
+
+
+def _render_template(tokens: list[str], values: dict[str, str]) -> str:
+    """Fill a compiled template; placeholders without a value stay as-is."""
+    return "".join(
+        values.get(tok, tok) if i % 2 else tok for i, tok in enumerate(tokens)
+    )
+
+
+# Body of the PR opened for each pushed GitHub repo.
+PR_BODY_TEMPLATE = (
+    "## Cascade Auto-Propagation\n\n"
+    "**Change:** {change}\n\n"
+    "**Files changed:** {files}\n\n"
+    "---\n*Created by [Cascade](https://github.com) "
+    "using Cline CLI as infrastructure.*"
+)
 
 
 # ── Event callback type ──────────────────────────────────────────
@@ -149,19 +277,98 @@ class Propagator:
             max_concurrent=config.settings.max_parallel,
             default_timeout=config.settings.timeout_per_repo,
         )
+        # Every repo is adapted/fixed and reviewed with the same flags, so
+        # the argv for each is built once here.
+        settings = config.settings
+        self._agent = self.cline.session(
+            yolo=True, model=settings.model or None, timeout=settings.timeout_per_repo,
+        )
+        # Cline calls are capped by the wrapper's own semaphore; test runs
+        # get a separate cap so the two stages fill up independently.
+        self._test_slots = asyncio.Semaphore(max(1, settings.max_parallel_tests))
+        self._reviewer = self.cline.session(
+            json_output=True, model=settings.model or None, timeout=120,
+        )
         self.on_event = on_event
+        self._event_queue: Optional[asyncio.Queue] = None
         self.adapt_template = adapt_prompt_template
         self.verify_template = verify_prompt_template
         self.fix_template = fix_prompt_template
+        self._adapt_tokens = _compile_template(adapt_prompt_template)
+        self._verify_tokens = _compile_template(verify_prompt_template)
+        self._fix_tokens = _compile_template(fix_prompt_template)
+
+    def _emit(self, event_type: str, data: dict):
+        """Queue an event for the dispatcher; never blocks the pipeline."""
+        if not self.on_event:
+            return
+        if self._event_queue is not None:
+            self._event_queue.put_nowait((event_type, data))
+        else:
+            asyncio.ensure_future(self._deliver(event_type, data))
+
+    def _emit_output(self, repo_name: str, line: str):
+        """Queue one output line; the dispatcher builds the event payload."""
+        if not self.on_event:
+            return
+        if self._event_queue is not None:
+            self._event_queue.put_nowait(("repo.output", (repo_name, line)))
+        else:
+            asyncio.ensure_future(
+                self._deliver("repo.output", {"repo": repo_name, "lines": [line]}),
+            )
 
-    async def _emit(self, event_type: str, data: dict):
+    def _make_output_forwarder(self, repo_name: str) -> Callable[[str], None]:
+        """A plain sync ``on_output`` callback that forwards lines for one repo."""
+        def forward(line: str):
+            self._emit_output(repo_name, line)
+        return forward
+
+    def _emit_repo(self, event_type: str, result: RepoResult, **extra: Any):
+        # Skip serializing the RepoResult when nobody is listening.
         if self.on_event:
-            try:
-                result = self.on_event(event_type, data)
-                if asyncio.iscoroutine(result):
-                    await result
-            except Exception:
-                pass
+            self._emit(event_type, {**result.to_dict(), **extra})
+
+    async def _deliver(self, event_type: str, data: dict):
+        try:
+            res = self.on_event(event_type, data)
+            if asyncio.iscoroutine(res):
+                await res
+        except Exception:
+            pass
+
+    async def _dispatch_events(self, queue: asyncio.Queue):
+        """
+        Deliver queued events in order, a batch at a time. Consecutive
+        ``repo.output`` lines for the same repo are coalesced into one
+        ``{"repo": ..., "lines": [...]}`` event. A ``None`` item stops it.
+        """
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+
+            pending: list[tuple[str, dict]] = []
+            stop = False
+            for item in batch:
+                if item is None:
+                    stop = True
+                    break
+                event_type, data = item
+                if event_type == "repo.output":
+                    # Queued by _emit_output as a bare (repo, line) pair.
+                    repo_name, line = data
+                    last = pending[-1] if pending else None
+                    if last and last[0] == "repo.output" and last[1]["repo"] == repo_name:
+                        last[1]["lines"].append(line)
+                        continue
+                    data = {"repo": repo_name, "lines": [line]}
+                pending.append((event_type, data))
+
+            for event_type, data in pending:
+                await self._deliver(event_type, data)
+            if stop:
+                return
 
     # ── Main entry ───────────────────────────────────────────
 
@@ -169,38 +376,73 @@ class Propagator:
         self,
         change_description: str,
         dry_run: bool = False,
+        result: Optional[CascadeResult] = None,
     ) -> CascadeResult:
-        cascade_result = CascadeResult(
-            change_description=change_description,
-            started_at=time.time(),
-        )
+        """Run the pipeline on every repo.
 
-        await self._emit("cascade.started", {
+        Pass ``result`` to have it filled in place while the run progresses
+        (e.g. for live rendering); otherwise a new one is created.
+        """
+        cascade_result = result if result is not None else CascadeResult()
+        cascade_result.change_description = change_description
+        cascade_result.started_at = time.time()
+
+        self._event_queue = asyncio.Queue()
+        dispatcher = asyncio.create_task(self._dispatch_events(self._event_queue))
+        try:
+            return await self._run_all(cascade_result, change_description, dry_run)
+        finally:
+            # Flush everything queued so far before returning.
+            self._event_queue.put_nowait(None)
+            self._event_queue = None
+            await dispatcher
+
+    async def _run_all(
+        self,
+        cascade_result: CascadeResult,
+        change_description: str,
+        dry_run: bool,
+    ) -> CascadeResult:
+        self._emit("cascade.started", {
             "change": change_description[:200],
             "repos": [r.name for r in self.config.repos],
         })
 
-        sem = asyncio.Semaphore(self.config.settings.max_parallel)
-        tasks = []
-
+        todo: asyncio.Queue[tuple[RepoConfig, RepoResult]] = asyncio.Queue()
         for repo_cfg in self.config.repos:
             repo_result = RepoResult(
                 repo_name=repo_cfg.name,
-                repo_path=str(repo_cfg.resolved_path),
+                repo_path=repo_cfg.resolved_path_str,
                 language=repo_cfg.language,
             )
             cascade_result.repo_results.append(repo_result)
+            todo.put_nowait((repo_cfg, repo_result))
 
-            async def _handle(rc=repo_cfg, rr=repo_result):
-                async with sem:
+        async def _worker():
+            while not todo.empty():
+                rc, rr = todo.get_nowait()
+                try:
                     await self._handle_repo(rc, rr, change_description, dry_run)
-
-            tasks.append(asyncio.create_task(_handle()))
-
-        await asyncio.gather(*tasks, return_exceptions=True)
+                except Exception:
+                    # _handle_repo records its own failures; one repo must
+                    # never take the TaskGroup (and its siblings) down.
+                    pass
+
+        # Workers drain the queue, rather than one task per repo all parked
+        # on a semaphore. There are enough of them to keep every Cline slot
+        # and every test slot busy at once: repos waiting on tests no longer
+        # hold back the next repo's adapt step.
+        settings = self.config.settings
+        workers = min(
+            max(1, settings.max_parallel) + max(1, settings.max_parallel_tests),
+            len(self.config.repos),
+        )
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(workers):
+                tg.create_task(_worker())
 
         cascade_result.finished_at = time.time()
-        await self._emit("cascade.completed", cascade_result.to_dict())
+        self._emit("cascade.completed", cascade_result.to_dict())
         return cascade_result
 
     # ── Per-repo pipeline ────────────────────────────────────
@@ -213,46 +455,49 @@ class Propagator:
         dry_run: bool,
     ):
         result.started_at = time.time()
-        git = GitOps(repo_cfg.resolved_path)
+        git = GitOps(repo_cfg.resolved_path_str)
+        repo_dir = repo_cfg.resolved_path_str
         settings = self.config.settings
 
+        base_branch: Optional[str] = None
+        repo_git, worktree = git, None
         try:
             # 0. Ensure git repo exists
             await git.ensure_repo()
-            base_branch = await git.current_branch()
+            base_branch = await git.base_branch()
 
             # 1. Create branch
             result.status = Status.BRANCHING
             branch_name = f"{settings.branch_prefix}{repo_cfg.name}"
-            try:
-                await git.create_branch(branch_name)
-            except Exception:
-                await git.checkout(branch_name)
+            if await git.is_bare():
+                # No working tree to switch: check the branch out into a
+                # private worktree and run the rest of the pipeline there.
+                worktree = await git.add_worktree(branch_name)
+                git, repo_dir = worktree, str(worktree.repo)
+            else:
+                try:
+                    await git.create_branch(branch_name)
+                except Exception:
+                    await git.checkout(branch_name)
             result.branch = branch_name
-            await self._emit("repo.branching", result.to_dict())
+            self._emit_repo("repo.branching", result)
 
             if dry_run:
                 result.status = Status.SKIPPED
                 result.finished_at = time.time()
-                await self._emit("repo.skipped", result.to_dict())
-                await git.checkout(base_branch)
+                self._emit_repo("repo.skipped", result)
                 return
 
             # 2. Adapt -- cline -y -c <repo> "apply change"
             result.status = Status.ADAPTING
-            await self._emit("repo.adapting", result.to_dict())
+            self._emit_repo("repo.adapting", result)
 
             adapt_prompt = self._build_adapt_prompt(change_description, repo_cfg)
 
-            adapt_result = await self.cline.invoke(
-                prompt=adapt_prompt,
-                cwd=str(repo_cfg.resolved_path),
-                yolo=True,
-                model=settings.model or None,
-                timeout=settings.timeout_per_repo,
-                on_output=lambda line: self._emit("repo.output", {
-                    "repo": repo_cfg.name, "line": line,
-                }),
+            adapt_result = await self._agent(
+                adapt_prompt,
+                cwd=repo_dir,
+                on_output=self._make_output_forwarder(repo_cfg.name),
             )
             result.adapt_result = adapt_result
 
@@ -260,8 +505,7 @@ class Propagator:
                 result.status = Status.FAILED
                 result.error = adapt_result.error or "Cline adaptation failed"
                 result.finished_at = time.time()
-                await self._emit("repo.failed", result.to_dict())
-                await git.checkout(base_branch)
+                self._emit_repo("repo.failed", result)
                 return
 
             # Check if Cline made any changes
@@ -269,16 +513,15 @@ class Propagator:
                 result.status = Status.SKIPPED
                 result.error = "No file changes produced"
                 result.finished_at = time.time()
-                await self._emit("repo.skipped", result.to_dict())
-                await git.checkout(base_branch)
+                self._emit_repo("repo.skipped", result)
                 return
 
             # 3. Test
             if repo_cfg.test_cmd:
                 result.status = Status.TESTING
-                await self._emit("repo.testing", result.to_dict())
+                self._emit_repo("repo.testing", result)
 
-                test_passed, test_output = await self._run_tests(repo_cfg)
+                test_passed, test_output = await self._run_tests(repo_cfg, repo_dir)
                 result.test_output = test_output
 
                 # 4. Fix loop on failure
@@ -287,20 +530,14 @@ class Propagator:
                     retries += 1
                     result.status = Status.FIXING
                     result.retries_used = retries
-                    await self._emit("repo.fixing", {**result.to_dict(), "retry": retries})
+                    self._emit_repo("repo.fixing", result, retry=retries)
 
                     fix_prompt = self._build_fix_prompt(
                         change_description, repo_cfg, test_output,
                     )
-                    await self.cline.invoke(
-                        prompt=fix_prompt,
-                        cwd=str(repo_cfg.resolved_path),
-                        yolo=True,
-                        model=settings.model or None,
-                        timeout=settings.timeout_per_repo,
-                    )
+                    await self._agent(fix_prompt, cwd=repo_dir)
 
-                    test_passed, test_output = await self._run_tests(repo_cfg)
+                    test_passed, test_output = await self._run_tests(repo_cfg, repo_dir)
                     result.test_output = test_output
 
                 result.test_passed = test_passed
@@ -308,106 +545,148 @@ class Propagator:
                     result.status = Status.FAILED
                     result.error = "Tests failed after retries"
                     result.finished_at = time.time()
-                    await self._emit("repo.failed", result.to_dict())
-                    await git.checkout(base_branch)
+                    self._emit_repo("repo.failed", result)
                     return
             else:
                 result.test_passed = True
 
             # 5. Self-review -- git diff | cline --json "review"
             result.status = Status.REVIEWING
-            await self._emit("repo.reviewing", result.to_dict())
+            self._emit_repo("repo.reviewing", result)
 
             diff_output = await git.diff()
             if diff_output:
                 review_prompt = self._build_verify_prompt(change_description)
-                review_result = await self.cline.invoke(
-                    prompt=review_prompt,
-                    json_output=True,
-                    stdin_data=diff_output,
-                    model=settings.model or None,
-                    timeout=120,
-                )
+                review_result = await self._reviewer(review_prompt, stdin_data=diff_output)
                 result.review_summary = review_result.text_output
 
             # 6. Stage and commit
             result.status = Status.COMMITTING
             await git.stage_all()
 
-            if await git.has_staged_changes():
-                result.files_changed = await git.diff_name_only(staged=True)
-                result.diff_stat = await git.diff_stat(staged=True)
+            files_changed, diff_stat = await git.staged_summary()
+            if files_changed:
+                result.files_changed = files_changed
+                result.diff_stat = diff_stat
                 commit_msg = f"cascade: {change_description[:60]}"
                 await git.commit(commit_msg)
 
             # 7. Push branch + create PR (for GitHub repos)
             if repo_cfg.is_github:
                 result.status = Status.PUSHING
-                await self._emit("repo.pushing", result.to_dict())
+                self._emit_repo("repo.pushing", result)
                 try:
-                    from .github_ops import push_branch, create_pr
-
                     ok, push_err = await push_branch(
-                        str(repo_cfg.resolved_path), branch_name,
+                        repo_dir, branch_name,
                     )
                     if ok:
                         result.pushed = True
-                        pr_body = (
-                            f"## Cascade Auto-Propagation\n\n"
-                            f"**Change:** {change_description}\n\n"
-                            f"**Files changed:** {len(result.files_changed)}\n\n"
-                            f"---\n*Created by [Cascade](https://github.com) "
-                            f"using Cline CLI as infrastructure.*"
-                        )
                         pr_result = await create_pr(
-                            str(repo_cfg.resolved_path),
+                            repo_dir,
                             title=f"cascade: {change_description[:60]}",
-                            body=pr_body,
+                            body=PR_BODY_TEMPLATE.format(
+                                change=change_description, files=len(result.files_changed),
+                            ),
                             base=base_branch,
                             head=branch_name,
                         )
                         if pr_result.success:
                             result.pr_url = pr_result.pr_url
                 except Exception as exc:
-                    await self._emit("repo.output", {
-                        "repo": repo_cfg.name,
-                        "line": f"Push/PR warning: {exc}\n",
-                    })
+                    self._emit_output(repo_cfg.name, f"Push/PR warning: {exc}\n")
 
             # Done
             result.status = Status.DONE
             result.finished_at = time.time()
-            await self._emit("repo.done", result.to_dict())
-
-            # Return to base branch
-            await git.checkout(base_branch)
+            self._emit_repo("repo.done", result)
 
         except Exception as exc:
             result.status = Status.FAILED
             result.error = str(exc)
             result.finished_at = time.time()
-            await self._emit("repo.failed", result.to_dict())
-            try:
-                await git.checkout(base_branch)
-            except Exception:
-                pass
+            self._emit_repo("repo.failed", result)
+        finally:
+            # Every exit path, including errors, returns to the base branch
+            # (or, for a bare repo, drops the worktree).
+            if worktree is not None:
+                try:
+                    await repo_git.remove_worktree(worktree.repo)
+                except Exception as exc:
+                    self._emit_output(
+                        repo_cfg.name, f"Could not remove worktree {worktree.repo}: {exc}\n",
+                    )
+            elif base_branch is not None:
+                await self._restore_branch(git, base_branch, repo_cfg.name)
+
+    async def _restore_branch(self, git: GitOps, base_branch: str, repo_name: str):
+        try:
+            # Cached probe: no spawn when nothing moved us off the branch.
+            if await git.current_branch() == base_branch:
+                return
+            await git.checkout(base_branch)
+        except Exception as exc:
+            self._emit_output(repo_name, f"Could not return to {base_branch}: {exc}\n")
 
     # ── Test runner ──────────────────────────────────────────
 
-    async def _run_tests(self, repo_cfg: RepoConfig) -> tuple[bool, str]:
+    async def _run_tests(
+        self, repo_cfg: RepoConfig, cwd: Optional[str] = None,
+    ) -> tuple[bool, str]:
         if not repo_cfg.test_cmd:
             return True, ""
+        async with self._test_slots:
+            return await self._exec_tests(repo_cfg, cwd or repo_cfg.resolved_path_str)
+
+    async def _exec_tests(self, repo_cfg: RepoConfig, cwd: str) -> tuple[bool, str]:
+        argv = _plain_argv(repo_cfg.test_cmd)
+        proc = None
+        if argv is not None:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    *argv,
+                    cwd=cwd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                )
+            except (FileNotFoundError, PermissionError):
+                # Not a program on disk (a builtin we do not list, a shell
+                # function, ...): let /bin/sh decide, as it always used to.
+                proc = None
+        if proc is None:
+            proc = await asyncio.create_subprocess_shell(
+                repo_cfg.test_cmd,
+                cwd=cwd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+            )
+        # Only the tail is kept; each line is also streamed to the UI.
+        tail: deque[str] = deque(maxlen=TEST_OUTPUT_LINES)
+
+        def _line(raw: bytes):
+            line = raw.decode("utf-8", errors="replace")
+            tail.append(line)
+            self._emit_output(repo_cfg.name, line)
+
+        async def _collect():
+            # Chunked reads rather than readline(), which gives up on lines
+            # longer than the stream limit (minified bundles, progress bars);
+            # such lines are passed on in 64 KiB pieces.
+            pending = b""
+            while chunk := await proc.stdout.read(65536):
+                pending += chunk
+                *lines, pending = pending.split(b"\n")
+                for raw in lines:
+                    _line(raw + b"\n")
+                if len(pending) > 65536:
+                    _line(pending)
+                    pending = b""
+            if pending:
+                _line(pending)
+            await proc.wait()
 
-        proc = await asyncio.create_subprocess_shell(
-            repo_cfg.test_cmd,
-            cwd=str(repo_cfg.resolved_path),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-        )
         try:
-            stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=120)
-            output = stdout.decode("utf-8", errors="replace")
-            return proc.returncode == 0, output
+            await asyncio.wait_for(_collect(), timeout=120)
+            return proc.returncode == 0, "".join(tail)
         except asyncio.TimeoutError:
             proc.kill()
             await proc.wait()
@@ -416,13 +695,12 @@ class Propagator:
     # ── Prompt builders ──────────────────────────────────────
 
     def _build_adapt_prompt(self, change: str, repo: RepoConfig) -> str:
-        if self.adapt_template:
-            return (
-                self.adapt_template
-                .replace("{{CHANGE}}", change)
-                .replace("{{REPO_NAME}}", repo.name)
-                .replace("{{LANGUAGE}}", repo.language)
-            )
+        if self._adapt_tokens:
+            return _render_template(self._adapt_tokens, {
+                "{{CHANGE}}": change,
+                "{{REPO_NAME}}": repo.name,
+                "{{LANGUAGE}}": repo.language,
+            })
         return (
             f"Apply the following API/schema change to this {repo.language} codebase:\n\n"
             f"CHANGE: {change}\n\n"
@@ -437,23 +715,23 @@ class Propagator:
         )
 
     def _build_fix_prompt(self, change: str, repo: RepoConfig, test_output: str) -> str:
-        if self.fix_template:
-            return (
-                self.fix_template
-                .replace("{{CHANGE}}", change)
-                .replace("{{REPO_NAME}}", repo.name)
-                .replace("{{TEST_OUTPUT}}", test_output[:3000])
-            )
+        excerpt = test_output[:3000]
+        if self._fix_tokens:
+            return _render_template(self._fix_tokens, {
+                "{{CHANGE}}": change,
+                "{{REPO_NAME}}": repo.name,
+                "{{TEST_OUTPUT}}": excerpt,
+            })
         return (
             f"The tests are failing after applying this change:\n\n"
             f"CHANGE: {change}\n\n"
-            f"TEST OUTPUT:\n{test_output[:3000]}\n\n"
+            f"TEST OUTPUT:\n{excerpt}\n\n"
             f"Fix the failing tests. Only change what is necessary to make tests pass."
         )
 
     def _build_verify_prompt(self, change: str) -> str:
-        if self.verify_template:
-            return self.verify_template.replace("{{CHANGE}}", change)
+        if self._verify_tokens:
+            return _render_template(self._verify_tokens, {"{{CHANGE}}": change})
         return (
             f"Review the following code diff for correctness.\n"
             f"The intended change was: {change}\n\n"
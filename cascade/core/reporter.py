@@ -2,45 +2,51 @@
 
 from __future__ import annotations
 
+import io
+
 from .propagator import CascadeResult, Status
 
+RULE = "=" * 60
+ICON = {Status.DONE: "OK", Status.SKIPPED: "SKIP"}
+
 
 def generate_summary(result: CascadeResult) -> str:
-    lines = [
-        "=" * 60,
-        "  CASCADE PROPAGATION SUMMARY",
-        "=" * 60,
-        "",
-        f"  Change: {result.change_description[:80]}",
-        f"  Duration: {result.duration}s",
+    buf = io.StringIO()
+    write = buf.write
+    write(
+        f"{RULE}\n"
+        "  CASCADE PROPAGATION SUMMARY\n"
+        f"{RULE}\n"
+        "\n"
+        f"  Change: {result.change_description[:80]}\n"
+        f"  Duration: {result.duration}s\n"
         f"  Repos: {len(result.repo_results)} total, "
-        f"{result.success_count} succeeded, {result.fail_count} failed",
-        "",
-        "-" * 60,
-    ]
+        f"{result.success_count} succeeded, {result.fail_count} failed\n"
+        "\n"
+        f"{'-' * 60}\n"
+    )
 
     for repo in result.repo_results:
-        icon = "OK" if repo.success else "SKIP" if repo.status == Status.SKIPPED else "FAIL"
-        lines.append(f"  [{icon:>4}] {repo.repo_name} ({repo.language})")
+        icon = ICON.get(repo.status, "FAIL")
+        write(f"  [{icon:>4}] {repo.repo_name} ({repo.language})\n")
         if repo.branch:
-            lines.append(f"         Branch: {repo.branch}")
+            write(f"         Branch: {repo.branch}\n")
         if repo.files_changed:
-            lines.append(f"         Files changed: {len(repo.files_changed)}")
+            write(f"         Files changed: {len(repo.files_changed)}\n")
             for f in repo.files_changed[:5]:
-                lines.append(f"           - {f}")
+                write(f"           - {f}\n")
             if len(repo.files_changed) > 5:
-                lines.append(f"           ... and {len(repo.files_changed) - 5} more")
+                write(f"           ... and {len(repo.files_changed) - 5} more\n")
         if repo.test_passed:
-            lines.append(f"         Tests: passed")
+            write("         Tests: passed\n")
         elif repo.test_output:
-            lines.append(f"         Tests: FAILED (retries: {repo.retries_used})")
+            write(f"         Tests: FAILED (retries: {repo.retries_used})\n")
         if repo.error:
-            lines.append(f"         Error: {repo.error[:80]}")
+            write(f"         Error: {repo.error[:80]}\n")
         if repo.review_summary:
             preview = repo.review_summary.replace("\n", " ")[:100]
-            lines.append(f"         Review: {preview}")
-        lines.append(f"         Duration: {repo.duration}s")
-        lines.append("")
+            write(f"         Review: {preview}\n")
+        write(f"         Duration: {repo.duration}s\n\n")
 
-    lines.append("=" * 60)
-    return "\n".join(lines)
+    write(RULE)
+    return buf.getvalue()
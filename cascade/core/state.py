@@ -0,0 +1,150 @@
+"""
+Run state persistence -- checkpoints cascade runs to SQLite as they progress.
+
+Each propagator event upserts the affected repo's row, so a crash mid-run
+keeps everything recorded so far and `cascade status` can be queried while
+a run is still going.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+import orjson
+
+STATE_DB = Path.home() / ".cascade" / "state.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    change      TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    ended_at    REAL,
+    status      TEXT NOT NULL DEFAULT 'running'
+);
+CREATE TABLE IF NOT EXISTS repo_results (
+    run_id      TEXT NOT NULL,
+    repo_name   TEXT NOT NULL,
+    status      TEXT NOT NULL,
+    branch      TEXT NOT NULL DEFAULT '',
+    files_json  TEXT NOT NULL DEFAULT '[]',
+    started_at  REAL NOT NULL,
+    duration    REAL NOT NULL DEFAULT 0,
+    test_passed INTEGER NOT NULL DEFAULT 0,
+    error       TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (run_id, repo_name)
+);
+"""
+
+_UPSERT_REPO = """
+INSERT INTO repo_results
+    (run_id, repo_name, status, branch, files_json, started_at, duration, test_passed, error)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (run_id, repo_name) DO UPDATE SET
+    status = excluded.status,
+    branch = excluded.branch,
+    files_json = excluded.files_json,
+    duration = excluded.duration,
+    test_passed = excluded.test_passed,
+    error = excluded.error
+"""
+
+
+class StateStore:
+    """SQLite-backed store of cascade runs and their per-repo results."""
+
+    def __init__(self, path: str | Path = STATE_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        # Databases written before runs.status existed: a finished run is one
+        # with ended_at set; the rest stay "running" as before.
+        cols = {r["name"] for r in self.conn.execute("PRAGMA table_info(runs)")}
+        if "status" not in cols:
+            with self.conn:
+                self.conn.execute(
+                    "ALTER TABLE runs ADD COLUMN status TEXT NOT NULL DEFAULT 'running'"
+                )
+                self.conn.execute(
+                    "UPDATE runs SET status = 'finished' WHERE ended_at IS NOT NULL"
+                )
+
+    def start_run(self, change: str) -> str:
+        run_id = uuid.uuid4().hex[:12]
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO runs (run_id, change, started_at) VALUES (?, ?, ?)",
+                (run_id, change, time.time()),
+            )
+        return run_id
+
+    def save_repo(self, run_id: str, repo: dict[str, Any]):
+        """Upsert one repo's state from a RepoResult.to_dict() payload."""
+        with self.conn:
+            self.conn.execute(_UPSERT_REPO, (
+                run_id,
+                repo["repo_name"],
+                repo.get("status", ""),
+                repo.get("branch", ""),
+                orjson.dumps(repo.get("files_changed", [])).decode(),
+                time.time(),
+                repo.get("duration_seconds", 0.0),
+                int(bool(repo.get("test_passed"))),
+                repo.get("error", ""),
+            ))
+
+    def finish_run(self, run_id: str, status: str = "finished"):
+        """Close a run; ``status`` is "finished", or "aborted" when the run
+        raised or was interrupted before completing."""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE runs SET ended_at = ?, status = ? WHERE run_id = ?",
+                (time.time(), status, run_id),
+            )
+
+    def latest_run(self) -> Optional[dict[str, Any]]:
+        """Return the most recently started run with its repo results."""
+        run = self.conn.execute(
+            "SELECT * FROM runs ORDER BY started_at DESC LIMIT 1"
+        ).fetchone()
+        if run is None:
+            return None
+        repos = self.conn.execute(
+            "SELECT * FROM repo_results WHERE run_id = ? ORDER BY started_at",
+            (run["run_id"],),
+        ).fetchall()
+        return {
+            "run_id": run["run_id"],
+            "change_description": run["change"],
+            "started_at": run["started_at"],
+            "ended_at": run["ended_at"],
+            "status": run["status"],
+            "in_progress": run["ended_at"] is None,
+            "repos": [
+                {
+                    "repo_name": r["repo_name"],
+                    "status": r["status"],
+                    "branch": r["branch"],
+                    "files_changed": orjson.loads(r["files_json"]),
+                    "duration_seconds": r["duration"],
+                    "test_passed": bool(r["test_passed"]),
+                    "error": r["error"],
+                }
+                for r in repos
+            ],
+        }
+
+    def close(self):
+        self.conn.close()
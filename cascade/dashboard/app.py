@@ -18,32 +18,36 @@ Endpoints:
 from __future__ import annotations
 
 import asyncio
-import json
+import hashlib
+import os
 import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 from typing import Any, Optional
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse
+import orjson
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import HTMLResponse, Response
 from pydantic import BaseModel
 
 from ..core.cline import ClineWrapper
 from ..core.config import CascadeConfig, RepoConfig, Settings, load_config
-from ..core.detector import detect_drift
+from ..core.detector import detect_drift_async, shutdown_pool
 from ..core.github_ops import (
     CloneResult,
     clone_repo,
-    create_pr,
+    close_github_http,
     detect_language,
     detect_test_cmd,
     get_repo_default_branch,
     parse_github_url,
-    push_branch,
+    push_and_pr_all,
 )
 from ..core.propagator import CascadeResult, Propagator
+from .store import open_store
 
-# Updated backend files for the "simulate" feature
-BACKEND_V2_MODELS = '''\
+# Updated backend files for the "simulate" feature, as bytes: written as-is
+BACKEND_V2_MODELS = b'''\
 """Data models for the cross-platform demo API (v2 -- full_name schema)."""
 
 from pydantic import BaseModel
@@ -79,14 +83,18 @@ POSTS_DB: list[dict] = [
     {"id": 1, "author_name": "Alice Johnson", "title": "Welcome", "body": "Hello everyone!"},
     {"id": 2, "author_name": "Bob Smith", "title": "Update", "body": "New features shipped."},
 ]
+
+# id -> record indexes, so lookups are O(1); keep them in step with the lists.
+USERS_BY_ID: dict[int, dict] = {u["id"]: u for u in USERS_DB}
+POSTS_BY_ID: dict[int, dict] = {p["id"]: p for p in POSTS_DB}
 '''
 
-BACKEND_V2_MAIN = '''\
+BACKEND_V2_MAIN = b'''\
 """FastAPI backend for the cross-platform demo application (v2 -- full_name schema)."""
 
 from fastapi import FastAPI, HTTPException
 
-from models import POSTS_DB, USERS_DB, Post, User, UserCreate
+from models import POSTS_DB, USERS_BY_ID, USERS_DB, Post, User, UserCreate
 
 app = FastAPI(title="Demo API", version="2.0.0")
 
@@ -103,17 +111,18 @@ def list_users():
 
 @app.get("/users/{user_id}", response_model=User)
 def get_user(user_id: int):
-    for u in USERS_DB:
-        if u["id"] == user_id:
-            return User(**u)
-    raise HTTPException(status_code=404, detail="User not found")
+    u = USERS_BY_ID.get(user_id)
+    if u is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return User(**u)
 
 
 @app.post("/users", response_model=User, status_code=201)
 def create_user(payload: UserCreate):
-    new_id = max(u["id"] for u in USERS_DB) + 1
+    new_id = max(USERS_BY_ID) + 1
     user_data = {"id": new_id, **payload.model_dump()}
     USERS_DB.append(user_data)
+    USERS_BY_ID[new_id] = user_data
     return User(**user_data)
 
 
@@ -124,13 +133,13 @@ def list_posts():
 
 @app.get("/users/{user_id}/display-name")
 def get_display_name(user_id: int):
-    for u in USERS_DB:
-        if u["id"] == user_id:
-            return {"display_name": u["full_name"]}
-    raise HTTPException(status_code=404, detail="User not found")
+    u = USERS_BY_ID.get(user_id)
+    if u is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"display_name": u["full_name"]}
 '''
 
-BACKEND_V2_TESTS = '''\
+BACKEND_V2_TESTS = b'''\
 """Tests for the demo backend API (v2 -- full_name schema)."""
 
 from fastapi.testclient import TestClient
@@ -205,80 +214,256 @@ class UpdateRoleRequest(BaseModel):
     role: str
 
 
+class OrjsonResponse(Response):
+    """JSON rendered by orjson, skipping FastAPI's jsonable_encoder pass.
+
+    Used by the endpoints the UI polls; their payloads are plain dicts.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _cached_json(request: Request, payload: dict, max_age: int = 1) -> Response:
+    """
+    ``payload`` as orjson-encoded JSON with a content-hash ETag, or an empty
+    304 when the poller already holds that version. ``max_age=0`` while
+    the state is expected to change makes clients revalidate every poll.
+    """
+    body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=OrjsonResponse.media_type, headers=headers)
+
+
 class Broadcaster:
+    __slots__ = ("clients",)
+
     def __init__(self):
-        self.clients: list[WebSocket] = []
+        self.clients: set[WebSocket] = set()
 
     async def connect(self, ws: WebSocket):
         await ws.accept()
-        self.clients.append(ws)
+        self.clients.add(ws)
 
     def disconnect(self, ws: WebSocket):
-        if ws in self.clients:
-            self.clients.remove(ws)
+        self.clients.discard(ws)
+
+    # Clients written to concurrently before yielding back to the loop.
+    BATCH = 50
 
-    async def send(self, message: dict):
+    async def send(self, payload: str):
+        """Send one pre-encoded JSON frame to every client."""
+        # Snapshot: clients may (dis)connect while we await the writes.
+        clients = tuple(self.clients)
         dead: list[WebSocket] = []
-        for ws in self.clients:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.clients.remove(ws)
+        for i in range(0, len(clients), self.BATCH):
+            batch = clients[i:i + self.BATCH]
+            # Concurrent writes: one slow client no longer holds up the rest.
+            results = await asyncio.gather(
+                *(ws.send_text(payload) for ws in batch), return_exceptions=True,
+            )
+            dead.extend(ws for ws, res in zip(batch, results) if isinstance(res, Exception))
+            if i + self.BATCH < len(clients):
+                await asyncio.sleep(0)
+        self.clients.difference_update(dead)
 
 
-async def _git(repo_path: str, *args: str) -> tuple[int, str]:
+async def _git(repo_path: str, *args: str) -> tuple[int, bytes]:
+    """Run git; return its exit code and raw stdout (stderr is discarded)."""
     proc = await asyncio.create_subprocess_exec(
         "git", *args,
         cwd=repo_path,
         stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
     )
-    stdout, stderr = await proc.communicate()
-    out = stdout.decode("utf-8", errors="replace").strip()
-    return proc.returncode or 0, out
+    stdout, _ = await proc.communicate()
+    return proc.returncode or 0, stdout
+
+
+async def _git_nocapture(repo_path: str, *args: str) -> int:
+    """Run git for its effect only: no pipes to allocate or drain."""
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=repo_path,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    return await proc.wait() or 0
+
+
+async def _git_refs(repo_path: str, tag: str) -> tuple[str, set[str], bool]:
+    """
+    ``(current branch, local branches, whether tag exists)`` from a single
+    ``git for-each-ref``, in place of separate rev-parse / branch / tag
+    calls. The current branch is "" on a detached HEAD.
+    """
+    _, out = await _git(
+        repo_path, "for-each-ref", "--format=%(HEAD)%(refname)",
+        "refs/heads", f"refs/tags/{tag}",
+    )
+    current, branches, has_tag = "", set(), False
+    for line in out.decode("utf-8", errors="replace").splitlines():
+        marker, ref = line[:1], line[1:]
+        if ref.startswith("refs/heads/"):
+            name = ref[len("refs/heads/"):]
+            branches.add(name)
+            if marker == "*":
+                current = name
+        elif ref == f"refs/tags/{tag}":
+            has_tag = True
+    return current, branches, has_tag
+
+
+# How long a drift report may answer repeated /detect polls.
+DETECT_TTL = 2.0
+
+
+def _detect_stamp(cfg: CascadeConfig) -> tuple:
+    """Cheap per-repo fingerprint: the path plus mtimes of the repo dir and
+    of its git index and HEAD, which commits, checkouts and adds touch."""
+    stamp = []
+    for r in cfg.repos:
+        root = r.resolved_path_str
+        for path in (root, os.path.join(root, ".git", "index"), os.path.join(root, ".git", "HEAD")):
+            try:
+                stamp.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                stamp.append(0)
+        stamp.append(root)
+    return tuple(stamp)
+
+
+def _github_config(repos: list[dict], settings: Optional[Settings] = None) -> CascadeConfig:
+    """The CascadeConfig for a list of imported GitHub repo dicts."""
+    return CascadeConfig(
+        name="github-import",
+        repos=[
+            RepoConfig(
+                name=r["name"],
+                path=r["path"],
+                role=r["role"],
+                language=r["language"],
+                test_cmd=r.get("test_cmd", ""),
+                github=r["github"],
+            )
+            for r in repos
+        ],
+        settings=settings or Settings(),
+    )
+
+
+# Config used when create_app is given none, e.g. under
+# ``uvicorn --factory cascade.dashboard.app:create_app``.
+CONFIG_ENV = "CASCADE_CONFIG"
 
 
 def create_app(config_path: Optional[str] = None) -> FastAPI:
-    app = FastAPI(title="Cascade Dashboard", version="0.2.0")
+    config_path = config_path or os.environ.get(CONFIG_ENV) or None
+    # Run flags, history and GitHub import state; in this process unless
+    # CASCADE_REDIS points the workers at a shared Redis.
+    store = open_store()
     bc = Broadcaster()
 
-    run_history: list[dict] = []
-    state: dict[str, Any] = {"current_run": None, "running": False}
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await store.start(bc.send)
+        try:
+            yield
+        finally:
+            await store.close()
+            await close_github_http()
+            shutdown_pool()
+
+    app = FastAPI(title="Cascade Dashboard", version="0.2.0", lifespan=lifespan)
 
     async def emit(event_type: str, data: dict):
-        await bc.send({"type": event_type, "data": data, "ts": time.time()})
+        # Encoded once here; every client gets the same frame.
+        payload = orjson.dumps(
+            {"type": event_type, "data": data, "ts": time.time()},
+            option=orjson.OPT_NON_STR_KEYS,
+        ).decode()
+        # A shared store fans the frame out to every worker, this one included.
+        if not await store.publish(payload):
+            await bc.send(payload)
 
     def _get_config():
         if not config_path:
             raise ValueError("No config path")
         return load_config(config_path)
 
+    # Polled detection results, keyed on _detect_stamp.
+    detect_cache: dict[tuple, tuple[float, dict]] = {}
+
+    async def _detect(cfg: CascadeConfig, fresh: bool = False) -> dict:
+        """
+        Drift report for ``cfg`` as a dict, served from memory for
+        DETECT_TTL seconds while the repos look untouched. Endpoints that
+        have just changed the repos pass ``fresh=True``.
+        """
+        key = _detect_stamp(cfg)
+        hit = detect_cache.get(key)
+        if not fresh and hit is not None and time.monotonic() - hit[0] < DETECT_TTL:
+            return hit[1]
+        report = (await detect_drift_async(cfg)).to_dict()
+        detect_cache.clear()
+        detect_cache[key] = (time.monotonic(), report)
+        return report
+
+    # Strong references to fire-and-forget tasks until they finish.
+    background: set[asyncio.Task] = set()
+
+    def _spawn(coro) -> asyncio.Task:
+        task = asyncio.create_task(coro)
+        background.add(task)
+        task.add_done_callback(background.discard)
+        return task
+
+    async def _detect_and_emit(cfg: CascadeConfig):
+        try:
+            report = await _detect(cfg, fresh=True)
+        except Exception as exc:
+            report = {"status": "error", "change_summary": str(exc), "repos": []}
+        await emit("detection.updated", report)
+
+    def _detect_later(cfg: CascadeConfig):
+        """Re-scan ``cfg`` off the request path; the report arrives over WS."""
+        _spawn(_detect_and_emit(cfg))
+
+    # Prompt templates ship with the package; read them once per app.
+    prompts_dir = Path(__file__).resolve().parent.parent / "prompts"
+    adapt_tpl = _load_tpl(prompts_dir / "adapt.md")
+    verify_tpl = _load_tpl(prompts_dir / "verify.md")
+    fix_tpl = _load_tpl(prompts_dir / "fix_tests.md")
+
     # ── Pages ──────────────────────────────────────────────
 
+    # The page is static: read and encode it once per app, not per request.
+    html_path = Path(__file__).parent / "templates" / "index.html"
+    index_html = html_path.read_bytes() if html_path.exists() else None
+    no_cache = {"Cache-Control": "no-cache, no-store, must-revalidate"}
+
     @app.get("/", response_class=HTMLResponse)
     async def index():
-        html_path = Path(__file__).parent / "templates" / "index.html"
-        if html_path.exists():
-            return HTMLResponse(
-                content=html_path.read_text(),
-                headers={"Cache-Control": "no-cache, no-store, must-revalidate"},
-            )
+        if index_html is not None:
+            return HTMLResponse(content=index_html, headers=no_cache)
         return HTMLResponse("<h1>Cascade Dashboard</h1><p>Template not found.</p>")
 
     # ── API ────────────────────────────────────────────────
 
-    @app.get("/api/health")
+    @app.get("/api/health", response_class=OrjsonResponse)
     async def health():
-        return {"status": "ok", "running": state["running"]}
+        return OrjsonResponse({"status": "ok", "running": await store.is_set("running")})
 
     @app.get("/api/detect")
     async def api_detect():
         try:
             cfg = _get_config()
-            report = detect_drift(cfg)
-            return report.to_dict()
+            return await _detect(cfg)
         except Exception as exc:
             return {"status": "error", "change_summary": str(exc), "repos": []}
 
@@ -291,29 +476,33 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
             if not source:
                 return {"error": "No source repo found"}
 
-            repo_dir = str(source.resolved_path)
+            repo_dir = source.resolved_path_str
 
             # Tag current state for reset
-            await _git(repo_dir, "tag", "-f", "cascade-original")
+            await _git_nocapture(repo_dir, "tag", "-f", "cascade-original")
 
             # Write updated files
-            (source.resolved_path / "models.py").write_text(BACKEND_V2_MODELS)
-            (source.resolved_path / "main.py").write_text(BACKEND_V2_MAIN)
-            (source.resolved_path / "test_api.py").write_text(BACKEND_V2_TESTS)
+            files = {
+                "models.py": BACKEND_V2_MODELS,
+                "main.py": BACKEND_V2_MAIN,
+                "test_api.py": BACKEND_V2_TESTS,
+            }
+            for name, content in files.items():
+                (source.resolved_path / name).write_bytes(content)
 
-            # Stage and commit
-            await _git(repo_dir, "add", "-A")
-            ret, _ = await _git(
+            # Stage only the files we wrote, commit
+            await _git_nocapture(repo_dir, "add", "--", *files)
+            await _git_nocapture(
                 repo_dir, "commit", "-m",
                 "API v2: full_name replaces first_name/last_name",
             )
 
-            # Re-run detection
-            report = detect_drift(cfg)
+            # Re-run detection in the background; sent as detection.updated
+            _detect_later(cfg)
             return {
                 "success": True,
                 "message": "Backend API updated to v2 schema (full_name)",
-                "detection": report.to_dict(),
+                "detection_pending": True,
             }
         except Exception as exc:
             return {"error": str(exc)}
@@ -323,62 +512,74 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
         """Reset all demo repos to their initial state."""
         try:
             cfg = _get_config()
-            results = []
+            prefix = cfg.settings.branch_prefix
 
-            for repo in cfg.repos:
-                repo_dir = str(repo.resolved_path)
-                branch_name = f"{cfg.settings.branch_prefix}{repo.name}"
+            async def _reset(repo) -> dict:
+                repo_dir = repo.resolved_path_str
+                branch_name = f"{prefix}{repo.name}"
 
-                # Get default branch
-                _, current = await _git(repo_dir, "rev-parse", "--abbrev-ref", "HEAD")
+                # One ref listing answers "which branch", "which branches"
+                # and "is the original tagged".
+                current, branches, has_original = await _git_refs(
+                    repo_dir, "cascade-original",
+                )
 
                 # If on a cascade branch, go back to main branch
-                if current.startswith(cfg.settings.branch_prefix):
-                    _, branches = await _git(repo_dir, "branch", "--format=%(refname:short)")
+                if current.startswith(prefix):
                     main_branch = "main" if "main" in branches else "master"
-                    await _git(repo_dir, "checkout", main_branch)
+                    await _git_nocapture(repo_dir, "checkout", main_branch)
 
                 # Delete cascade branches
-                await _git(repo_dir, "branch", "-D", branch_name)
+                if branch_name in branches:
+                    await _git_nocapture(repo_dir, "branch", "-D", branch_name)
 
                 # For source repo: restore original files from tag
-                if repo.role == "source":
-                    ret, _ = await _git(repo_dir, "tag", "-l", "cascade-original")
-                    if ret == 0:
-                        await _git(repo_dir, "checkout", "cascade-original", "--", ".")
-                        await _git(repo_dir, "add", "-A")
-                        await _git(
-                            repo_dir, "commit", "-m",
-                            "Reset to original schema",
-                        )
-
-                results.append({"repo": repo.name, "status": "reset"})
-
-            report = detect_drift(cfg)
+                if repo.role == "source" and has_original:
+                    await _git_nocapture(repo_dir, "checkout", "cascade-original", "--", ".")
+                    await _git_nocapture(repo_dir, "add", "-A")
+                    await _git_nocapture(
+                        repo_dir, "commit", "-m",
+                        "Reset to original schema",
+                    )
+
+                return {"repo": repo.name, "status": "reset"}
+
+            # Repos are independent; reset them concurrently, but keep the
+            # number of repos with git children in flight bounded.
+            slots = asyncio.Semaphore(os.cpu_count() or 4)
+
+            async def _reset_bounded(repo) -> dict:
+                async with slots:
+                    return await _reset(repo)
+
+            results = list(await asyncio.gather(*(_reset_bounded(r) for r in cfg.repos)))
+
+            _detect_later(cfg)
             return {
                 "success": True,
                 "message": "All repos reset to initial state",
                 "repos": results,
-                "detection": report.to_dict(),
+                "detection_pending": True,
             }
         except Exception as exc:
             return {"error": str(exc)}
 
-    @app.get("/api/status")
-    async def api_status():
-        return {
-            "current_run": state["current_run"],
-            "history_count": len(run_history),
-            "running": state["running"],
-        }
+    @app.get("/api/status", response_class=OrjsonResponse)
+    async def api_status(request: Request):
+        running = await store.is_set("running")
+        return _cached_json(request, {
+            "current_run": await store.current_run(),
+            "history_count": await store.history_count(),
+            "running": running,
+        }, max_age=0 if running else 1)
 
-    @app.get("/api/history")
-    async def api_history():
-        return {"runs": run_history[-20:]}
+    @app.get("/api/history", response_class=OrjsonResponse)
+    async def api_history(request: Request):
+        return _cached_json(request, {"runs": await store.history()})
 
     @app.post("/api/run")
     async def api_run(body: RunRequest):
-        if state["running"]:
+        if await store.is_set("running"):
             return {"error": "A run is already in progress"}
 
         change = body.change
@@ -392,14 +593,14 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
             default_timeout=cfg.settings.timeout_per_repo,
         )
 
-        prompts_dir = Path(__file__).resolve().parent.parent / "prompts"
-        adapt_tpl = _load_tpl(prompts_dir / "adapt.md")
-        verify_tpl = _load_tpl(prompts_dir / "verify.md")
-        fix_tpl = _load_tpl(prompts_dir / "fix_tests.md")
-
-        state["running"] = True
+        # Taken here rather than inside the task, so a second request cannot
+        # slip in before the run starts; the task releases it when done.
+        if not await store.acquire("running"):
+            return {"error": "A run is already in progress"}
 
         async def _run_in_background():
+            # Keeps a shared (Redis) flag from expiring mid-run.
+            beat = _spawn(store.keep_alive("running"))
             try:
                 propagator = Propagator(
                     config=cfg,
@@ -411,61 +612,77 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
                 )
                 result = await propagator.run(change)
                 result_dict = result.to_dict()
-                state["current_run"] = result_dict
-                run_history.append(result_dict)
+                await store.record_run(result_dict)
                 await emit("cascade.completed", result_dict)
             finally:
-                state["running"] = False
+                beat.cancel()
+                await store.release("running")
 
-        asyncio.create_task(_run_in_background())
+        _spawn(_run_in_background())
         return {"status": "started", "change": change}
 
     # ── GitHub integration ─────────────────────────────────
 
     WORKSPACE_DIR = Path(__file__).resolve().parent.parent / "workspace"
-    gh_state: dict[str, Any] = {
-        "repos": [],       # list of dicts: {name, github, path, role, language, ...}
-        "cloning": False,
-        "prs": [],         # list of PRResult dicts
-        "config": None,    # CascadeConfig built from GitHub repos
-    }
+    # The store holds "repos" (dicts: {name, github, path, role, language,
+    # ...}) and "prs" (PRResult dicts); the CascadeConfig is built from repos.
 
     @app.post("/api/github/import")
     async def api_github_import(body: GitHubImportRequest):
         """Clone GitHub repos, detect languages, build dynamic config."""
-        if gh_state["cloning"]:
+        if not await store.acquire("cloning"):
             return {"error": "Clone already in progress"}
 
         repos = body.repos
         source_repo = body.source_repo
 
-        gh_state["cloning"] = True
-        gh_state["repos"] = []
-        gh_state["prs"] = []
         results: list[dict] = []
+        beat = _spawn(store.keep_alive("cloning"))
 
         try:
+            await store.put("repos", [])
+            await store.put("prs", [])
             WORKSPACE_DIR.mkdir(parents=True, exist_ok=True)
 
-            for url in repos:
-                url = url.strip()
-                if not url:
-                    continue
+            # Clones are network-bound and detection is filesystem-bound, so
+            # repos are imported concurrently, a bounded number at a time.
+            settings = Settings()
+            slots = asyncio.Semaphore(settings.max_parallel)
 
-                await emit("github.cloning", {"repo": url})
-                cr = await clone_repo(url, WORKSPACE_DIR, depth=0)
+            # Cloned repos in completion order, published as each one lands
+            # so /api/github/status fills in while the import runs.
+            landed: list[dict] = []
 
-                if not cr.success:
-                    results.append({
-                        "name": cr.name,
+            async def _import_one(url: str) -> dict:
+                try:
+                    repo_info = await _clone_and_scan(url)
+                except Exception as exc:
+                    return {
+                        "name": url.rstrip("/").rsplit("/", 1)[-1],
                         "github": url,
                         "status": "failed",
-                        "error": cr.error,
-                    })
-                    continue
-
-                lang = await detect_language(cr.local_path)
-                test_cmd = await detect_test_cmd(cr.local_path, lang)
+                        "error": str(exc),
+                    }
+                if repo_info["status"] == "cloned":
+                    landed.append(repo_info)
+                    await store.put("repos", landed)
+                return repo_info
+
+            async def _clone_and_scan(url: str) -> dict:
+                async with slots:
+                    await emit("github.cloning", {"repo": url})
+                    cr = await clone_repo(url, WORKSPACE_DIR)
+
+                    if not cr.success:
+                        return {
+                            "name": cr.name,
+                            "github": url,
+                            "status": "failed",
+                            "error": cr.error,
+                        }
+
+                    lang = await detect_language(cr.local_path)
+                    test_cmd = await detect_test_cmd(cr.local_path, lang)
                 owner, _ = parse_github_url(url)
                 is_source = (
                     cr.name == source_repo
@@ -483,30 +700,19 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
                     "default_branch": cr.default_branch,
                     "status": "cloned",
                 }
-                gh_state["repos"].append(repo_info)
-                results.append(repo_info)
                 await emit("github.cloned", repo_info)
+                return repo_info
 
-            repo_configs = [
-                RepoConfig(
-                    name=r["name"],
-                    path=r["path"],
-                    role=r["role"],
-                    language=r["language"],
-                    test_cmd=r.get("test_cmd", ""),
-                    github=r["github"],
-                )
-                for r in gh_state["repos"]
-            ]
-            gh_state["config"] = CascadeConfig(
-                name="github-import",
-                repos=repo_configs,
-                settings=Settings(),
-            )
+            # Duplicates would clone into the same directory at once.
+            urls = list(dict.fromkeys(u for u in (url.strip() for url in repos) if u))
+            # gather keeps results in request order.
+            results = list(await asyncio.gather(*(_import_one(u) for u in urls)))
+            # Final list in request order.
+            cloned = [r for r in results if r["status"] == "cloned"]
+            await store.put("repos", cloned)
 
             try:
-                report = detect_drift(gh_state["config"])
-                detection = report.to_dict()
+                detection = await _detect(_github_config(cloned, settings), fresh=True)
             except Exception:
                 detection = None
 
@@ -519,17 +725,18 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
         except Exception as exc:
             return {"error": str(exc)}
         finally:
-            gh_state["cloning"] = False
+            beat.cancel()
+            await store.release("cloning")
 
     @app.post("/api/github/detect")
     async def api_github_detect():
         """Run drift detection on GitHub-imported repos."""
-        if not gh_state["config"]:
+        repos = await store.get("repos", [])
+        if not repos:
             return {"error": "No GitHub repos imported. Use /api/github/import first."}
 
         try:
-            report = detect_drift(gh_state["config"])
-            return report.to_dict()
+            return await _detect(_github_config(repos))
         except Exception as exc:
             return {"status": "error", "change_summary": str(exc), "repos": []}
 
@@ -537,25 +744,24 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
     async def api_github_run(body: RunRequest):
         """Run propagation on GitHub-imported repos, then push + create PRs."""
         change = body.change
-        if state["running"]:
+        if await store.is_set("running"):
             return {"error": "A run is already in progress"}
-        if not gh_state["config"]:
+        repos = await store.get("repos", [])
+        if not repos:
             return {"error": "No GitHub repos imported. Use /api/github/import first."}
 
-        cfg = gh_state["config"]
+        cfg = _github_config(repos)
         cline = ClineWrapper(
             max_concurrent=cfg.settings.max_parallel,
             default_timeout=cfg.settings.timeout_per_repo,
         )
 
-        prompts_dir = Path(__file__).resolve().parent.parent / "prompts"
-        adapt_tpl = _load_tpl(prompts_dir / "adapt.md")
-        verify_tpl = _load_tpl(prompts_dir / "verify.md")
-        fix_tpl = _load_tpl(prompts_dir / "fix_tests.md")
-
-        state["running"] = True
+        if not await store.acquire("running"):
+            return {"error": "A run is already in progress"}
 
         async def _run_github():
+            # Keeps a shared (Redis) flag from expiring mid-run.
+            beat = _spawn(store.keep_alive("running"))
             try:
                 propagator = Propagator(
                     config=cfg,
@@ -567,25 +773,27 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
                 )
                 result = await propagator.run(change)
                 result_dict = result.to_dict()
-                state["current_run"] = result_dict
-                run_history.append(result_dict)
+                await store.record_run(result_dict)
                 await emit("cascade.completed", result_dict)
             finally:
-                state["running"] = False
+                beat.cancel()
+                await store.release("running")
 
-        asyncio.create_task(_run_github())
+        _spawn(_run_github())
         return {"status": "started", "change": change}
 
     @app.post("/api/github/prs")
     async def api_github_create_prs():
         """Push cascade branches and create PRs for all propagated repos."""
-        if not gh_state["repos"]:
+        repos = await store.get("repos", [])
+        if not repos:
             return {"error": "No GitHub repos imported"}
-        if not state.get("current_run"):
+        run = await store.current_run()
+        if not run:
             return {"error": "No propagation run to create PRs from"}
 
-        run = state["current_run"]
-        pr_results: list[dict] = []
+        change_desc = run.get("change_description", "schema change")
+        jobs: list[tuple[str, str, str, str, str]] = []
 
         for repo_run in run.get("repos", []):
             if repo_run["status"] != "done":
@@ -593,7 +801,7 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
 
             repo_name = repo_run["repo_name"]
             repo_info = next(
-                (r for r in gh_state["repos"] if r["name"] == repo_name), None,
+                (r for r in repos if r["name"] == repo_name), None,
             )
             if not repo_info or repo_info["role"] == "source":
                 continue
@@ -605,27 +813,6 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
             repo_dir = repo_info["path"]
             default_branch = repo_info.get("default_branch", "main")
 
-            await emit("github.pushing", {"repo": repo_name, "branch": branch})
-
-            _, current = await _git(repo_dir, "rev-parse", "--abbrev-ref", "HEAD")
-            if current != branch:
-                await _git(repo_dir, "checkout", branch)
-
-            ok, push_err = await push_branch(repo_dir, branch)
-            if not ok:
-                pr_results.append({
-                    "repo_name": repo_name,
-                    "branch": branch,
-                    "success": False,
-                    "error": f"Push failed: {push_err}",
-                    "pr_url": "",
-                })
-                await _git(repo_dir, "checkout", default_branch)
-                continue
-
-            await emit("github.creating_pr", {"repo": repo_name, "branch": branch})
-
-            change_desc = run.get("change_description", "schema change")
             pr_body = (
                 f"## Cascade Auto-Propagation\n\n"
                 f"**Change:** {change_desc}\n\n"
@@ -635,51 +822,45 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
                 f"---\n*Created by Cascade using [Cline CLI](https://cline.bot) "
                 f"as infrastructure.*"
             )
+            jobs.append((
+                repo_dir, branch, f"cascade: {change_desc[:60]}", pr_body, default_branch,
+            ))
 
-            pr_res = await create_pr(
-                repo_dir,
-                title=f"cascade: {change_desc[:60]}",
-                body=pr_body,
-                base=default_branch,
-                head=branch,
-            )
+        # Branches are pushed by ref, so no checkout is needed around this.
+        # Pushes and PR creation for different repos overlap.
+        results = await push_and_pr_all(jobs, max_parallel=min(8, len(jobs) or 1), on_event=emit)
+        pr_results = [r.to_dict() for r in results]
 
-            pr_dict = pr_res.to_dict()
-            pr_results.append(pr_dict)
-            await emit("github.pr_created", pr_dict)
-
-            await _git(repo_dir, "checkout", default_branch)
-
-        gh_state["prs"] = pr_results
+        await store.put("prs", pr_results)
         return {"success": True, "prs": pr_results}
 
-    @app.get("/api/github/status")
-    async def api_github_status():
+    @app.get("/api/github/status", response_class=OrjsonResponse)
+    async def api_github_status(request: Request):
         """Current state of the GitHub integration."""
-        return {
-            "repos": gh_state["repos"],
-            "prs": gh_state["prs"],
-            "cloning": gh_state["cloning"],
-            "has_config": gh_state["config"] is not None,
-        }
+        repos = await store.get("repos", [])
+        cloning = await store.is_set("cloning")
+        return _cached_json(request, {
+            "repos": repos,
+            "prs": await store.get("prs", []),
+            "cloning": cloning,
+            "has_config": bool(repos),
+        }, max_age=0 if cloning else 1)
 
     @app.post("/api/github/update-role")
     async def api_github_update_role(body: UpdateRoleRequest):
         """Update the role of an imported GitHub repo (source/consumer)."""
         repo_name = body.repo_name
         role = body.role
-        for r in gh_state["repos"]:
+        repos = await store.get("repos", [])
+        for r in repos:
             if r["name"] == repo_name:
                 r["role"] = role
                 break
         else:
             return {"error": f"Repo '{repo_name}' not found"}
 
-        if gh_state["config"]:
-            for rc in gh_state["config"].repos:
-                if rc.name == repo_name:
-                    rc.role = role
-                    break
+        # The config is rebuilt from the stored repos, so this covers it too.
+        await store.put("repos", repos)
 
         return {"success": True, "repo": repo_name, "role": role}
 
@@ -689,14 +870,10 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
     async def ws_endpoint(ws: WebSocket):
         await bc.connect(ws)
         try:
+            # Keepalive is protocol-level ping/pong, answered by the server's
+            # websocket implementation; frames are read only to see the close.
             while True:
-                raw = await ws.receive_text()
-                try:
-                    msg = json.loads(raw)
-                    if msg.get("type") == "ping":
-                        await ws.send_json({"type": "pong"})
-                except json.JSONDecodeError:
-                    pass
+                await ws.receive_text()
         except WebSocketDisconnect:
             bc.disconnect(ws)
 
@@ -704,4 +881,7 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
 
 
 def _load_tpl(path: Path) -> Optional[str]:
-    return path.read_text() if path.exists() else None
+    try:
+        return path.read_bytes().decode("utf-8")
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,206 @@
+"""
+Dashboard state shared between uvicorn workers.
+
+By default everything lives in this process, exactly as a single worker
+needs. When ``CASCADE_REDIS`` names a Redis server (and the ``redis``
+package is installed), the run/clone flags, run history, GitHub import
+state and the WebSocket event stream go through Redis instead, so every
+worker answers with the same dashboard and forwards every event to its
+own clients.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional: pip install cascade[redis]
+    aioredis = None
+
+REDIS_ENV = "CASCADE_REDIS"
+
+HISTORY_LEN = 20
+EVENTS_CHANNEL = "cascade:events"
+
+# Redis flag expiry in seconds. The holder refreshes it every
+# HEARTBEAT_EVERY of that (keep_alive), so a worker that dies holding a
+# flag frees it within one TTL while long runs keep theirs.
+FLAG_TTL = {"running": 60, "cloning": 60}
+HEARTBEAT_EVERY = 1 / 3
+
+Deliver = Callable[[str], Awaitable[None]]
+
+
+class LocalStore:
+    """In-process state: the single-worker default."""
+
+    shared = False
+
+    def __init__(self):
+        # One asyncio.Lock per flag ("running", "cloning"). It is taken by
+        # the request handler and released by the task doing the work.
+        self._locks: defaultdict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._current_run: Optional[dict] = None
+        # Only the last HISTORY_LEN runs are ever served; keep no more.
+        self._history: deque[dict] = deque(maxlen=HISTORY_LEN)
+        self._run_count = 0
+        self._github: dict[str, Any] = {}
+
+    async def acquire(self, flag: str) -> bool:
+        """Set ``flag`` unless it is already set; report whether we set it."""
+        lock = self._locks[flag]
+        if lock.locked():
+            return False
+        # Uncontended, so this takes the lock without yielding to the loop.
+        await lock.acquire()
+        return True
+
+    async def release(self, flag: str):
+        lock = self._locks[flag]
+        if lock.locked():
+            lock.release()
+
+    async def is_set(self, flag: str) -> bool:
+        return self._locks[flag].locked()
+
+    async def keep_alive(self, flag: str):
+        """Lock flags do not expire; nothing to refresh."""
+
+    async def record_run(self, result: dict):
+        self._current_run = result
+        self._history.append(result)
+        self._run_count += 1
+
+    async def current_run(self) -> Optional[dict]:
+        return self._current_run
+
+    async def history(self) -> list[dict]:
+        """The last HISTORY_LEN runs, oldest first."""
+        return list(self._history)
+
+    async def history_count(self) -> int:
+        return self._run_count
+
+    async def get(self, field: str, default: Any = None) -> Any:
+        return self._github.get(field, default)
+
+    async def put(self, field: str, value: Any):
+        self._github[field] = value
+
+    async def publish(self, payload: str) -> bool:
+        """Hand an event frame to other workers; False means deliver it here."""
+        return False
+
+    async def start(self, deliver: Deliver):
+        pass
+
+    async def close(self):
+        pass
+
+
+class RedisStore:
+    """Redis-backed state; every worker pointed at the same URL agrees."""
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "cascade:"):
+        self._redis = aioredis.from_url(url)
+        self._prefix = prefix
+        self._listener: Optional[asyncio.Task] = None
+
+    def _key(self, name: str) -> str:
+        return self._prefix + name
+
+    async def acquire(self, flag: str) -> bool:
+        return bool(await self._redis.set(
+            self._key(flag), b"1", nx=True, ex=FLAG_TTL.get(flag, 60),
+        ))
+
+    async def release(self, flag: str):
+        await self._redis.delete(self._key(flag))
+
+    async def is_set(self, flag: str) -> bool:
+        return bool(await self._redis.exists(self._key(flag)))
+
+    async def keep_alive(self, flag: str):
+        """Refresh ``flag``'s expiry until cancelled by its holder."""
+        ttl = FLAG_TTL.get(flag, 60)
+        while True:
+            await asyncio.sleep(ttl * HEARTBEAT_EVERY)
+            await self._redis.expire(self._key(flag), ttl)
+
+    async def record_run(self, result: dict):
+        raw = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+        history = self._key("history")
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.set(self._key("current_run"), raw)
+            pipe.lpush(history, raw)
+            pipe.ltrim(history, 0, HISTORY_LEN - 1)
+            pipe.incr(self._key("run_count"))
+            await pipe.execute()
+
+    async def current_run(self) -> Optional[dict]:
+        raw = await self._redis.get(self._key("current_run"))
+        return orjson.loads(raw) if raw else None
+
+    async def history(self) -> list[dict]:
+        # LPUSH keeps the newest first; callers expect oldest first.
+        raws = await self._redis.lrange(self._key("history"), 0, HISTORY_LEN - 1)
+        return [orjson.loads(raw) for raw in reversed(raws)]
+
+    async def history_count(self) -> int:
+        return int(await self._redis.get(self._key("run_count")) or 0)
+
+    async def get(self, field: str, default: Any = None) -> Any:
+        raw = await self._redis.hget(self._key("github"), field)
+        return orjson.loads(raw) if raw else default
+
+    async def put(self, field: str, value: Any):
+        await self._redis.hset(self._key("github"), field, orjson.dumps(value))
+
+    async def publish(self, payload: str) -> bool:
+        await self._redis.publish(EVENTS_CHANNEL, payload)
+        return True
+
+    async def start(self, deliver: Deliver):
+        """Forward every published event to this worker's clients."""
+        pubsub = self._redis.pubsub()
+        await pubsub.subscribe(EVENTS_CHANNEL)
+
+        async def _listen():
+            try:
+                async for msg in pubsub.listen():
+                    if msg["type"] == "message":
+                        await deliver(msg["data"].decode())
+            finally:
+                await pubsub.aclose()
+
+        self._listener = asyncio.create_task(_listen())
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await self._redis.aclose()
+
+
+def open_store(url: Optional[str] = None) -> LocalStore | RedisStore:
+    """RedisStore when ``url`` (default: $CASCADE_REDIS) is set, else LocalStore."""
+    url = url if url is not None else os.environ.get(REDIS_ENV)
+    if not url:
+        return LocalStore()
+    if aioredis is None:
+        raise RuntimeError(
+            f"{REDIS_ENV} is set but the redis package is not installed "
+            "(pip install 'cascade[redis]')"
+        )
+    return RedisStore(url)
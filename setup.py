@@ -11,9 +11,17 @@ setup(
         "uvicorn[standard]>=0.27.0",
         "websockets>=12.0",
         "pyyaml>=6.0",
+        "orjson>=3.8",
         "pydantic>=2.5.0",
         "python-dotenv>=1.0.0",
+        # Event loop for the CLI and dashboard; not available on Windows.
+        'uvloop>=0.19; sys_platform != "win32"',
     ],
+    extras_require={
+        "aho": ["pyahocorasick>=2.0"],
+        "redis": ["redis>=5.0.1"],
+        "github": ["httpx>=0.24"],
+    },
     entry_points={
         "console_scripts": [
             "cascade=cascade.cli:app",